@@ -0,0 +1,339 @@
+import multiprocessing
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+import util
+from landmarks import LandmarkIndex
+
+USAGE = ("Usage: python benchmark.py search [directory] [pairs] [seed]\n"
+         "       python benchmark.py frontier [max exponent]\n"
+         "       python benchmark.py memory [directory] [pairs]\n"
+         "       python benchmark.py landmarks [directory] [pairs] [count]\n"
+         "       python benchmark.py names [directory] [queries]\n"
+         "       python benchmark.py neighbors [directory] [pairs] [capacity]")
+
+# Frontier classes compared by the frontier microbenchmark
+FRONTIERS = [
+    util.StackFrontier,
+    util.QueueFrontier,
+    util.DequeStackFrontier,
+    util.DequeQueueFrontier,
+]
+
+# Largest frontier the list-copying frontiers are timed at
+LEGACY_LIMIT = 10 ** 4
+
+# Number of contains_state calls timed per frontier size
+LOOKUPS = 1000
+
+
+def compare_engines(pairs, engines):
+    """
+    Runs shortest_path engines over the same (source, target) pairs.
+    Returns a dictionary mapping each engine to its totals.
+    """
+    results = {
+        engine: {"explored": 0, "seconds": 0.0, "lengths": []}
+        for engine in engines
+    }
+    for source, target in pairs:
+        for engine in engines:
+            start = time.perf_counter()
+            try:
+                path = degrees.shortest_path(source, target, engine=engine)
+                length = len(path)
+            except Exception:
+                length = None
+            results[engine]["seconds"] += time.perf_counter() - start
+            results[engine]["explored"] += degrees.num_explored
+            results[engine]["lengths"].append(length)
+    return results
+
+
+def time_frontier(frontier_class, size):
+    """
+    Fills a frontier with `size` nodes, probes it and drains it.
+    Returns seconds spent in add, contains_state and remove.
+    """
+    nodes = [util.Node(state=i, parent=None, action=None) for i in range(size)]
+    frontier = frontier_class()
+
+    start = time.perf_counter()
+    for node in nodes:
+        frontier.add(node)
+    added = time.perf_counter()
+    for i in range(LOOKUPS):
+        frontier.contains_state(i * size // LOOKUPS)
+    probed = time.perf_counter()
+    while not frontier.empty():
+        frontier.remove()
+    drained = time.perf_counter()
+
+    return added - start, probed - added, drained - probed
+
+
+def benchmark_frontiers(largest):
+    """Prints per-operation timings for each frontier class."""
+    print(f"{'frontier':<22}{'size':>9}{'add ns':>10}"
+          f"{'contains ns':>13}{'remove ns':>11}")
+    for exponent in range(3, largest + 1):
+        size = 10 ** exponent
+        for frontier_class in FRONTIERS:
+            name = frontier_class.__name__
+            if not name.startswith("Deque") and size > LEGACY_LIMIT:
+                print(f"{name:<22}{size:>9}{'skipped (quadratic)':>34}")
+                continue
+            add, contains, remove = time_frontier(frontier_class, size)
+            print(f"{name:<22}{size:>9}{add / size * 1e9:>10.0f}"
+                  f"{contains / LOOKUPS * 1e9:>13.0f}"
+                  f"{remove / size * 1e9:>11.0f}")
+
+
+def random_pairs(count, seed):
+    """Returns `count` random pairs of people who starred in something."""
+    candidates = sorted(
+        person_id for person_id in degrees.people
+        if degrees.movie_count(person_id) > 0
+    )
+    rng = random.Random(seed)
+    return [tuple(rng.sample(candidates, 2)) for _ in range(count)]
+
+
+def report_engines(pairs, engines, label):
+    """Compares engines on pairs and prints their explored counts and times."""
+    results = compare_engines(pairs, engines)
+
+    # Every engine must agree on the length of each shortest path
+    lengths = [results[engine]["lengths"] for engine in engines]
+    if any(other != lengths[0] for other in lengths[1:]):
+        sys.exit("Engines disagree on path lengths.")
+
+    print(f"{len(pairs)} random pairs from {label}")
+    print(f"{'engine':<15}{'explored':>12}{'avg ms':>12}")
+    for engine in engines:
+        explored = results[engine]["explored"]
+        average = results[engine]["seconds"] / len(pairs) * 1000
+        print(f"{engine:<15}{explored:>12}{average:>12.2f}")
+
+
+def benchmark_search(args):
+    """Compares shortest_path engines on random pairs of people."""
+    if len(args) > 3:
+        sys.exit(USAGE)
+    directory = args[0] if len(args) > 0 else "large"
+    count = int(args[1]) if len(args) > 1 else 20
+    seed = int(args[2]) if len(args) > 2 else 0
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    engines = [engine for engine in degrees.ENGINES if engine != "landmarks"]
+    report_engines(random_pairs(count, seed), engines, directory)
+
+
+def benchmark_landmarks(args):
+    """
+    Builds a landmark index in memory and compares the A* landmark
+    engine against plain and bidirectional BFS.
+    """
+    if len(args) > 3:
+        sys.exit(USAGE)
+    directory = args[0] if len(args) > 0 else "large"
+    count = int(args[1]) if len(args) > 1 else 20
+    landmarks = int(args[2]) if len(args) > 2 else 8
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    start = time.perf_counter()
+    degrees.landmark_index = LandmarkIndex.build(
+        degrees.people, degrees.movie_count, degrees.neighbors_for_person,
+        count=landmarks)
+    print(f"Built {landmarks} landmarks in "
+          f"{time.perf_counter() - start:.2f} s")
+
+    engines = ["bfs", "bidirectional", "landmarks"]
+    report_engines(random_pairs(count, 0), engines, directory)
+
+
+def time_load(directory, options):
+    """Returns the seconds load_data takes with the given options."""
+    start = time.perf_counter()
+    degrees.load_data(directory, **options)
+    return time.perf_counter() - start
+
+
+def trace_load(directory, options):
+    """
+    Loads a dataset under tracemalloc.
+    Returns (bytes still allocated, peak bytes allocated).
+    """
+    tracemalloc.start()
+    degrees.load_data(directory, **options)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def time_queries(directory, options, count):
+    """
+    Loads a dataset and times BFS between `count` random pairs.
+    Returns the average milliseconds per query.
+    """
+    degrees.load_data(directory, **options)
+    pairs = random_pairs(count, 0)
+    start = time.perf_counter()
+    for source, target in pairs:
+        try:
+            degrees.shortest_path(source, target)
+        except Exception:
+            pass
+    return (time.perf_counter() - start) / count * 1000
+
+
+def in_fresh_process(function, *args):
+    """Calls function in a new process so no loaded data is shared."""
+    with multiprocessing.Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def benchmark_memory(args):
+    """
+    Compares load time, memory and BFS query time of the dict, compact,
+    compact without metadata and snapshot layouts. Time and memory are
+    measured in separate runs since tracing allocations slows loading
+    down.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    directory = args[0] if len(args) > 0 else "large"
+    count = int(args[1]) if len(args) > 1 else 20
+
+    layouts = [
+        ("dict", {}),
+        ("compact", {"compact": True}),
+        ("no meta", {"metadata": False}),
+        ("snapshot", {"cache": True}),
+    ]
+
+    # Make sure the snapshot layout maps an existing snapshot
+    seconds = in_fresh_process(time_load, directory, {"cache": True})
+    print(f"First snapshot load (builds it if missing): {seconds:.3f} s")
+
+    print(f"{'layout':<12}{'load s':>10}{'resident MB':>14}{'peak MB':>10}"
+          f"{'query ms':>10}")
+    for layout, options in layouts:
+        seconds = in_fresh_process(time_load, directory, options)
+        current, peak = in_fresh_process(trace_load, directory, options)
+        query = in_fresh_process(time_queries, directory, options, count)
+        print(f"{layout:<12}{seconds:>10.3f}"
+              f"{current / 2 ** 20:>14.1f}{peak / 2 ** 20:>10.1f}"
+              f"{query:>10.2f}")
+
+
+def misspell(name, rng):
+    """Returns name with one random character replaced."""
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def benchmark_names(args):
+    """Times exact, prefix and fuzzy lookups in the NameIndex."""
+    if len(args) > 2:
+        sys.exit(USAGE)
+    directory = args[0] if len(args) > 0 else "large"
+    count = int(args[1]) if len(args) > 1 else 1000
+
+    print("Loading data...")
+    start = time.perf_counter()
+    degrees.load_data(directory, fuzzy=True)
+    print(f"Data loaded and names indexed in "
+          f"{time.perf_counter() - start:.2f} s")
+
+    index = degrees.name_index
+    rng = random.Random(0)
+    sample = [rng.choice(index.names) for _ in range(count)]
+    lookups = [
+        ("exact", index.exact, sample),
+        ("prefix", index.prefix, [name[:-1] for name in sample]),
+        ("fuzzy", index.fuzzy, [misspell(name, rng) for name in sample]),
+    ]
+
+    print(f"{'lookup':<10}{'avg us':>10}{'found %':>10}")
+    for lookup, search, queries in lookups:
+        found = 0
+        start = time.perf_counter()
+        for query, name in zip(queries, sample):
+            if any(match[1] == name for match in search(query)):
+                found += 1
+        average = (time.perf_counter() - start) / count * 1e6
+        print(f"{lookup:<10}{average:>10.1f}{found / count * 100:>10.1f}")
+
+
+def benchmark_neighbors(args):
+    """
+    Times BFS and bidirectional queries with and without the neighbor
+    cache, counting cache hits and neighbor pairs allocated.
+    """
+    if len(args) > 3:
+        sys.exit(USAGE)
+    directory = args[0] if len(args) > 0 else "large"
+    count = int(args[1]) if len(args) > 1 else 20
+    capacity = int(args[2]) if len(args) > 2 else 10 ** 7
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+    pairs = random_pairs(count, 0)
+
+    print(f"{'engine':<15}{'cache':<7}{'avg ms':>10}"
+          f"{'hits':>12}{'built':>12}{'pairs':>14}")
+    for engine in ["bfs", "bidirectional"]:
+        for cached in [False, True]:
+            degrees.neighbor_cache = None
+            if cached:
+                degrees.enable_neighbor_cache(capacity)
+            totals = {"hits": 0, "built": 0, "pairs": 0}
+            start = time.perf_counter()
+            for source, target in pairs:
+                try:
+                    degrees.shortest_path(source, target, engine=engine)
+                except Exception:
+                    pass
+                for counter in totals:
+                    totals[counter] += degrees.neighbor_counts[counter]
+            average = (time.perf_counter() - start) / count * 1000
+            print(f"{engine:<15}{'on' if cached else 'off':<7}"
+                  f"{average:>10.2f}{totals['hits']:>12}"
+                  f"{totals['built']:>12}{totals['pairs']:>14}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(USAGE)
+    command, args = sys.argv[1], sys.argv[2:]
+    if command == "search":
+        benchmark_search(args)
+    elif command == "frontier":
+        if len(args) > 1:
+            sys.exit(USAGE)
+        benchmark_frontiers(int(args[0]) if args else 6)
+    elif command == "memory":
+        benchmark_memory(args)
+    elif command == "landmarks":
+        benchmark_landmarks(args)
+    elif command == "names":
+        benchmark_names(args)
+    elif command == "neighbors":
+        benchmark_neighbors(args)
+    else:
+        sys.exit(USAGE)
+
+
+if __name__ == "__main__":
+    main()
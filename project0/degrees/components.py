@@ -0,0 +1,146 @@
+"""
+Connected components of the people graph, labelled with a union-find
+over stars.csv.
+
+The file is split into byte ranges that can be processed in parallel:
+each chunk joins the people in every movie it sees, and the chunk
+results are then merged, joining people across chunks through the
+movies they share.
+"""
+
+import csv
+import multiprocessing
+import os
+
+
+class UnionFind():
+    """Disjoint sets over hashable items, created on first use."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent
+        if item not in parent:
+            parent[item] = item
+            return item
+        while parent[item] != item:
+
+            # Path halving keeps the trees shallow
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def chunk_ranges(path, chunks):
+    """Splits a file into `chunks` contiguous (start, end) byte ranges."""
+    size = os.path.getsize(path)
+    step = max(1, -(-size // chunks))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def union_chunk(path, start, end):
+    """
+    Joins the people of each movie among the rows of stars.csv that
+    begin within [start, end). Returns (pairs, movies): a (person_id,
+    root person_id) pair for every person seen who is not a root and a
+    representative person_id for every movie seen.
+    """
+    sets = UnionFind()
+    movies = {}
+    with open(path, "rb") as f:
+        if start == 0:
+
+            # Skip the header row
+            position = len(f.readline())
+        else:
+
+            # Step back one byte so a row starting exactly at `start` is
+            # kept, and skip the rest of the row the previous chunk owns
+            f.seek(start - 1)
+            position = start - 1 + len(f.readline())
+
+        lines = []
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            lines.append(line.decode("utf-8"))
+
+    for row in csv.reader(lines):
+        if len(row) != 2:
+            continue
+        person_id, movie_id = row
+        if movie_id in movies:
+            sets.union(movies[movie_id], person_id)
+        else:
+            movies[movie_id] = person_id
+            sets.find(person_id)
+
+    pairs = []
+    for person_id in sets.parent:
+        root = sets.find(person_id)
+        if root != person_id:
+            pairs.append((person_id, root))
+    return pairs, movies
+
+
+def label_components(directory, workers=1, chunks=None):
+    """
+    Returns a dictionary mapping every person_id in stars.csv to a
+    component number. People with no stars rows are not labelled;
+    each of them is a component of their own.
+
+    Rows naming unknown people or movies are not filtered out. That can
+    only merge components, so different labels always mean "not connected".
+    """
+    path = os.path.join(directory, "stars.csv")
+    ranges = chunk_ranges(path, chunks or workers * 4)
+    tasks = [(path, start, end) for start, end in ranges]
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(union_chunk, tasks)
+    else:
+        results = [union_chunk(*task) for task in tasks]
+
+    # Merge chunks: first their own unions, then movies split across chunks
+    sets = UnionFind()
+    representatives = {}
+    for pairs, movies in results:
+        for person_id, root in pairs:
+            sets.union(root, person_id)
+        for movie_id, person_id in movies.items():
+            if movie_id in representatives:
+                sets.union(representatives[movie_id], person_id)
+            else:
+                representatives[movie_id] = person_id
+
+    labels, numbers = {}, {}
+    for person_id in sets.parent:
+        root = sets.find(person_id)
+        if root not in numbers:
+            numbers[root] = len(numbers)
+        labels[person_id] = numbers[root]
+    return labels
+
+
+def component_sizes(labels, people):
+    """
+    Returns the sizes of all components among `people`, largest first,
+    counting unlabelled people as components of one.
+    """
+    sizes = {}
+    singletons = 0
+    for person_id in people:
+        label = labels.get(person_id)
+        if label is None:
+            singletons += 1
+        else:
+            sizes[label] = sizes.get(label, 0) + 1
+    return sorted(sizes.values(), reverse=True) + [1] * singletons
@@ -2,10 +2,20 @@
 # December 2020
 # Project 0
 
+import argparse
 import csv
+import json
+import multiprocessing
 import sys
+from functools import partial
+from heapq import heappush, heappop
 
-from util import Node, StackFrontier, QueueFrontier
+from components import label_components, component_sizes
+from graph import (StarGraph, PeopleView, MoviesView, NamesView,
+                   load_snapshot, source_stamp)
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
+from util import Node, DequeQueueFrontier, LRUCache, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -16,11 +26,88 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact StarGraph holding the data when loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Sizes and modification times of the CSV files loaded (see source_stamp)
+data_stamp = None
+
+# NameIndex for prefix and fuzzy name lookups, when built by load_data
+name_index = None
+
+# Maps person_ids to connected component numbers, once labelled
+components = None
+
+# LandmarkIndex used by the "landmarks" engine, once loaded
+landmark_index = None
+
+# Person -> neighbor pairs cache, once enabled by enable_neighbor_cache
+neighbor_cache = None
+
+# Since the last shortest_path call: neighbors_for_person calls served
+# from the cache, neighbor lists built and (movie_id, person_id) pairs
+# allocated for them
+neighbor_counts = {"hits": 0, "built": 0, "pairs": 0}
+
+# Number of states explored by the most recent shortest_path call
+num_explored = 0
+
+# Search engines understood by shortest_path
+ENGINES = ("bfs", "bidirectional", "tree", "landmarks")
+
+# Most people the cached BFS trees may cover in total (about 150 bytes each)
+TREE_CACHE_SIZE = 5_000_000
+
+# BFS trees by source person_id, sized by the number of people they reach
+bfs_trees = LRUCache(TREE_CACHE_SIZE, size=lambda tree: len(tree["parents"]))
+
+
+def load_data(directory, compact=False, cache=False, fuzzy=False,
+              metadata=True, stats=None):
     """
     Load data from CSV files into memory.
+
+    With compact=True the data is kept in an integer-indexed StarGraph
+    and `names`, `people` and `movies` become read-only views of it.
+    That trades speed for memory: every neighbor lookup binary searches
+    and decodes string ids, so searches run about 3 times slower than
+    on the dictionaries.
+    With cache=True that StarGraph is memory-mapped from a snapshot in
+    the directory, which is (re)written whenever the CSV files change.
+    With fuzzy=True a NameIndex is built for prefix and fuzzy lookups.
+
+    The compact layouts stream the CSV files (see StarGraph.from_csv);
+    metadata=False leaves out births, titles and years, and a `stats`
+    dictionary is filled with rows per second and peak memory.
     """
+    global graph, names, people, movies, data_stamp
+    data_stamp = source_stamp(directory)
+
+    # Trees and neighbor lists built on previously loaded data no
+    # longer apply
+    bfs_trees.clear()
+    if neighbor_cache is not None:
+        neighbor_cache.clear()
+
+    if not metadata:
+        compact = True
+    if compact or cache:
+        if cache:
+            graph = load_snapshot(directory, metadata=metadata, stats=stats)
+        else:
+            graph = StarGraph.from_csv(directory, metadata=metadata,
+                                       stats=stats)
+        names = NamesView(graph)
+        people = PeopleView(graph)
+        movies = MoviesView(graph)
+        if fuzzy:
+            index_names()
+        return
+
+    # Start from empty dictionaries, even after a compact load
+    graph = None
+    names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -55,16 +142,136 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    if fuzzy:
+        index_names()
+
+
+def index_names():
+    """Builds the NameIndex of everyone loaded."""
+    global name_index
+    if graph is not None:
+        entries = zip(graph.person_ids, graph.person_names,
+                      graph.person_births)
+    else:
+        entries = ((person_id, person["name"], person["birth"])
+                   for person_id, person in people.items())
+    name_index = NameIndex(entries)
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--engine", choices=ENGINES, default="bfs",
+                        help="search engine used to find the path")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the data in compact integer arrays, "
+                             "using less memory but searching about 3 "
+                             "times slower")
+    parser.add_argument("--cache", action="store_true",
+                        help="map the compact data from a binary snapshot")
+    parser.add_argument("--skip-metadata", action="store_true",
+                        help="load compactly without births, titles "
+                             "and years")
+    parser.add_argument("--load-stats", action="store_true",
+                        help="report rows per second and peak memory "
+                             "of a compact load")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="index names for prefix and fuzzy matching")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer the pairs in FILE ('-' for stdin), "
+                             "one 'source,target' pair per line, "
+                             "as JSON lines on stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering batch queries")
+    parser.add_argument("--histogram", metavar="NAME",
+                        help="print, as JSON, how many people are at each "
+                             "degree of separation from NAME")
+    parser.add_argument("--neighbor-cache", type=int, metavar="PAIRS",
+                        help="cache neighbor lists of up to PAIRS "
+                             "(movie, person) pairs in total")
+    parser.add_argument("--components", action="store_true",
+                        help="label connected components at load time to "
+                             "reject disconnected pairs immediately")
+    parser.add_argument("--landmarks", metavar="FILE",
+                        help="landmark index used by --engine landmarks")
+    parser.add_argument("--build-landmarks", metavar="FILE",
+                        help="build a landmark index, save it to FILE "
+                             "and exit")
+    parser.add_argument("--landmark-count", type=int, default=8,
+                        help="number of landmarks to build")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="append the search statistics of every query "
+                             "to FILE as JSON lines")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="include the memory high-water mark of each "
+                             "query in --stats (slower)")
+    args = parser.parse_args()
+    directory = args.directory
+    if args.engine == "landmarks" and not args.landmarks:
+        parser.error("--engine landmarks needs --landmarks FILE")
+
+    # Keep stdout clean for the JSON output of batch and histogram mode
+    log = sys.stderr if args.batch or args.histogram else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    stats = {} if args.load_stats else None
+    load_data(directory, compact=args.compact, cache=args.cache,
+              fuzzy=args.fuzzy, metadata=not args.skip_metadata, stats=stats)
+    print("Data loaded.", file=log)
+    if stats:
+        print(f"Loaded {stats['rows']} rows in {stats['seconds']:.2f} s "
+              f"({stats['rows_per_second']:.0f} rows/s), "
+              f"peak memory {stats['peak_memory_mb']:.0f} MB.", file=log)
+
+    if args.neighbor_cache:
+        enable_neighbor_cache(args.neighbor_cache)
+
+    if args.components:
+        sizes = load_components(directory, workers=args.workers)
+        largest = ", ".join(str(size) for size in sizes[:5])
+        print(f"{len(sizes)} components, largest: {largest} people.",
+              file=log)
+
+    if args.build_landmarks:
+        index = build_landmarks(args.build_landmarks, args.landmark_count)
+        print(f"Saved {len(index.landmarks)} landmarks "
+              f"to {args.build_landmarks}.")
+        return
+    if args.landmarks:
+        try:
+            load_landmarks(args.landmarks)
+        except ValueError as e:
+            sys.exit(str(e))
+
+    stats_out = None
+    if args.stats:
+        stats_out = open(args.stats, "a", encoding="utf-8")
+
+    if args.batch:
+        if args.batch == "-":
+            pairs = read_pairs(sys.stdin)
+            run_batch(pairs, args, sys.stdout, stats_out)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(read_pairs(f), args, sys.stdout, stats_out)
+        if stats_out is not None:
+            stats_out.close()
+        return
+
+    if args.histogram:
+        try:
+            source = resolve_person(args.histogram)
+        except ValueError as e:
+            sys.exit(str(e))
+        histogram = bfs_tree(source)["histogram"]
+        print(json.dumps({
+            "source_id": source,
+            "reachable": sum(histogram),
+            "histogram": histogram
+        }))
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -73,7 +280,13 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    stats = SearchStats(args.trace_memory) if stats_out else None
+    try:
+        path = shortest_path(source, target, engine=args.engine, stats=stats)
+    finally:
+        if stats_out is not None:
+            stats_out.write(stats.to_json() + "\n")
+            stats_out.close()
 
     if path is None:
         print("Not connected.")
@@ -88,20 +301,179 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def read_pairs(f):
+    """
+    Yields (source, target) name or id pairs from a CSV file. Rows with
+    another number of fields are yielded as they are, for answer_query
+    to report.
+    """
+    for row in csv.reader(f):
+        if not row:
+            continue
+        yield tuple(field.strip() for field in row)
+
+
+def run_batch(pairs, args, out, stats_out=None):
+    """
+    Answers every (source, target) pair, writing one JSON object per
+    line to `out` in input order. With args.workers > 1 the queries are
+    spread over a process pool; forked workers share the loaded data.
+    With `stats_out`, the search statistics of each query are written
+    to it as JSON lines too.
+    """
+    stats = SearchStats(args.trace_memory) if stats_out else None
+    answer = partial(answer_query, engine=args.engine, stats=stats)
+
+    def write(result):
+        if "stats" in result:
+            stats_out.write(json.dumps(result.pop("stats")) + "\n")
+        out.write(json.dumps(result) + "\n")
+
+        # Stream each answer, even when out is a block-buffered pipe
+        out.flush()
+
+    if args.workers > 1:
+        with multiprocessing.Pool(args.workers, initializer=init_worker,
+                                  initargs=(args,)) as pool:
+            for result in pool.imap(answer, pairs, chunksize=16):
+                write(result)
+    else:
+        for result in map(answer, pairs):
+            write(result)
+
+
+def init_worker(args):
+    """Loads the data in a pool worker that did not inherit it."""
+    if len(people) == 0:
+        load_data(args.directory, compact=args.compact, cache=args.cache,
+                  fuzzy=args.fuzzy, metadata=not args.skip_metadata)
+        if args.components:
+            load_components(args.directory)
+        if args.landmarks:
+            load_landmarks(args.landmarks)
+    if args.neighbor_cache and neighbor_cache is None:
+        enable_neighbor_cache(args.neighbor_cache)
+
+
+def answer_query(pair, engine="bfs", stats=None):
+    """
+    Returns a JSON-ready dictionary answering one (source, target) pair:
+    the path, its number of degrees and the number of states explored.
+    With a SearchStats hook, its report is included under "stats".
+    """
+    if len(pair) != 2:
+        return {"input": ",".join(pair),
+                "error": f"expected 'source,target', got {list(pair)}"}
+
+    result = {"source": pair[0], "target": pair[1]}
+    try:
+        source = resolve_person(pair[0])
+        target = resolve_person(pair[1])
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    try:
+        path = shortest_path(source, target, engine=engine, stats=stats)
+    except Exception:
+        path = None
+    if stats is not None:
+        result["stats"] = stats.report()
+    result["source_id"] = source
+    result["target_id"] = target
+    result["degrees"] = None if path is None else len(path)
+    result["path"] = path
+    result["explored"] = num_explored
+    result["neighbors"] = dict(neighbor_counts)
+    return result
+
+
+def resolve_person(text):
+    """
+    Returns the person_id for an IMDB id or an unambiguous name.
+    Raises ValueError otherwise.
+    """
+    if text in people:
+        return text
+    person_ids = names.get(text.lower(), set())
+    if len(person_ids) == 0:
+        if name_index is not None:
+            suggestions = [match[0] for match in name_index.search(text)]
+            if suggestions:
+                raise ValueError(f"person not found: {text} "
+                                 f"(did you mean ids {', '.join(suggestions)})")
+        raise ValueError(f"person not found: {text}")
+    if len(person_ids) > 1:
+        raise ValueError(f"ambiguous name: {text} "
+                         f"(ids {', '.join(sorted(person_ids))})")
+    return next(iter(person_ids))
+
+
+def shortest_path(source, target, engine="bfs", stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `engine` selects the search: "bfs" searches outward from the source
+    only, "bidirectional" searches from both ends at once and "tree"
+    reads the path from a cached BFS tree of the source. "landmarks"
+    runs A* guided by the loaded landmark index (see load_landmarks).
+
+    `stats` is an optional util.SearchStats hook that records the cost
+    of the search.
+
     If no possible path, returns None.
     """
+    for count in neighbor_counts:
+        neighbor_counts[count] = 0
+    if stats is None:
+        return find_path(source, target, engine, None)
+
+    stats.begin(engine=engine, source=source, target=target)
+    path = None
+    try:
+        path = find_path(source, target, engine, stats)
+        return path
+    finally:
+        stats.end(degrees=None if path is None else len(path))
+
+
+def find_path(source, target, engine, stats):
+    """Runs the search engine for shortest_path."""
+    global num_explored
+    if source != target and not connected(source, target):
+        num_explored = 0
+        raise Exception("no solution")
+
+    if engine == "bfs":
+        return bfs_path(source, target, stats)
+    if engine == "bidirectional":
+        return bidirectional_path(source, target, stats)
+    if engine == "tree":
+        return path_from_tree(bfs_tree(source, stats), target)
+    if engine == "landmarks":
+        return landmark_path(source, target, stats)
+    raise ValueError(f"unknown engine {engine!r}")
+
+
+def bfs_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from the source.
+    """
     # Keep track of number of states explored
+    global num_explored
     num_explored = 0
 
+    # A person is zero degrees from themselves
+    if source == target:
+        return []
+
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
     # Use BFS - it might take longer but will find the shortest path
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     frontier.add(start)
 
     # Initialize an empty explored set
@@ -117,6 +489,8 @@ def shortest_path(source, target):
         # Choose a node from the frontier
         node = frontier.remove()
         num_explored += 1
+        if stats is not None:
+            stats.expanded()
 
     # Mark node as explored and move on
         explored.add(node.state)
@@ -139,6 +513,266 @@ def shortest_path(source, target):
                     path.reverse()
                     return path
                 frontier.add(child)
+            elif stats is not None:
+                stats.duplicate()
+        if stats is not None:
+            stats.frontier(len(frontier.frontier))
+
+
+def bidirectional_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends and always growing the smaller frontier by one level.
+    """
+    global num_explored
+    num_explored = 0
+
+    if source == target:
+        return []
+
+    # Each side maps a reached person to (movie_id, person_id) of the
+    # person one step closer to where that side started
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Grow whichever side currently has less work queued
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, reached, other = forward_frontier, forward, backward
+        else:
+            frontier, reached, other = backward_frontier, backward, forward
+
+        next_frontier = []
+        for person_id in frontier:
+            num_explored += 1
+            if stats is not None:
+                stats.expanded()
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in reached:
+                    if stats is not None:
+                        stats.duplicate()
+                    continue
+                reached[neighbor] = (movie_id, person_id)
+
+                # The two searches have met - join their halves.
+                # Every meeting found on this level has the same length,
+                # so the first one is a shortest path.
+                if neighbor in other:
+                    return join_paths(forward, backward, neighbor)
+                next_frontier.append(neighbor)
+
+        if reached is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+        if stats is not None:
+            stats.frontier(len(forward_frontier) + len(backward_frontier))
+
+    raise Exception("no solution")
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Returns the (movie_id, person_id) path through `meeting` given the
+    parent maps of a forward and a backward search.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def bfs_tree(source, stats=None):
+    """
+    Returns the breadth-first search tree of everyone reachable from
+    source, as a dictionary of:
+    source, parents (maps person_id to the (movie_id, person_id) one
+    step closer to source, or None for source itself) and histogram
+    (number of people at each degree of separation).
+
+    Trees are cached, so asking again for the same source is free.
+    """
+    global num_explored
+    num_explored = 0
+
+    tree = bfs_trees.get(source)
+    if tree is not None:
+        return tree
+
+    parents = {source: None}
+    histogram = []
+    frontier = [source]
+    while frontier:
+        histogram.append(len(frontier))
+        if stats is not None:
+            stats.frontier(len(frontier))
+        next_frontier = []
+        for person_id in frontier:
+            num_explored += 1
+            if stats is not None:
+                stats.expanded()
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor not in parents:
+                    parents[neighbor] = (movie_id, person_id)
+                    next_frontier.append(neighbor)
+                elif stats is not None:
+                    stats.duplicate()
+        frontier = next_frontier
+
+    tree = {"source": source, "parents": parents, "histogram": histogram}
+    bfs_trees.put(source, tree)
+    return tree
+
+
+def path_from_tree(tree, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs from the
+    tree's source to target, following parent pointers back from target.
+    Raises the same "no solution" exception as shortest_path if target
+    is not in the tree.
+    """
+    parents = tree["parents"]
+    if target not in parents:
+        raise Exception("no solution")
+    path = []
+    person_id = target
+    while parents[person_id] is not None:
+        movie_id, parent = parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+    return path
+
+
+def enable_neighbor_cache(capacity):
+    """
+    Memoizes neighbors_for_person in an LRU cache holding at most
+    `capacity` (movie_id, person_id) pairs in total.
+    """
+    global neighbor_cache
+    neighbor_cache = LRUCache(capacity)
+
+
+def load_components(directory, workers=1):
+    """
+    Labels the connected components of the people graph so that
+    shortest_path rejects disconnected pairs without searching.
+    Returns the component sizes, largest first.
+    """
+    global components
+    components = label_components(directory, workers=workers)
+    return component_sizes(components, people)
+
+
+def connected(source, target):
+    """
+    Returns False if source and target are known to be in different
+    components, True if they may be connected.
+    """
+    if components is None:
+        return True
+    label = components.get(source)
+    return label is not None and label == components.get(target)
+
+
+def load_landmarks(path):
+    """
+    Loads the landmark index used by the "landmarks" engine. Raises
+    ValueError if it was built on other data than the data loaded, as
+    its bounds would then mislead the search.
+    """
+    global landmark_index
+    index = LandmarkIndex.load(path)
+    if index.stamp != data_stamp or len(index.person_ids) != len(people):
+        raise ValueError(f"{path} was built on other data; rebuild it "
+                         f"with --build-landmarks")
+    landmark_index = index
+
+
+def build_landmarks(path, count=8):
+    """Builds a landmark index over everyone loaded and saves it to path."""
+    index = LandmarkIndex.build(
+        people, movie_count, neighbors_for_person, count=count)
+    index.stamp = data_stamp
+    index.save(path)
+    return index
+
+
+def movie_count(person_id):
+    """Returns the number of movies a person starred in."""
+    if graph is not None:
+        person = graph.person_index(person_id)
+        return graph.person_offsets[person + 1] - graph.person_offsets[person]
+    return len(people[person_id]["movies"])
+
+
+def landmark_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search with
+    landmark lower bounds on the remaining distance.
+    """
+    global num_explored
+    num_explored = 0
+
+    if landmark_index is None:
+        raise Exception("no landmark index loaded")
+    bound = landmark_index.bound_to(target)
+    if bound(source) is None:
+        raise Exception("no solution")
+
+    parents = {source: None}
+    cost = {source: 0}
+    explored = set()
+    frontier = [(bound(source), 0, source)]
+
+    while frontier:
+        # Ties go to the deeper node, which is closer to finishing
+        _, depth, person_id = heappop(frontier)
+        g = -depth
+        if person_id in explored:
+            continue
+        if person_id == target:
+            path = []
+            while parents[person_id] is not None:
+                movie_id, parent = parents[person_id]
+                path.append((movie_id, person_id))
+                person_id = parent
+            path.reverse()
+            return path
+
+        explored.add(person_id)
+        num_explored += 1
+        if stats is not None:
+            stats.expanded()
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in explored or cost.get(neighbor, g + 2) <= g + 1:
+                if stats is not None:
+                    stats.duplicate()
+                continue
+            h = bound(neighbor)
+            if h is None:
+                continue
+            cost[neighbor] = g + 1
+            parents[neighbor] = (movie_id, person_id)
+            heappush(frontier, (g + 1 + h, -(g + 1), neighbor))
+        if stats is not None:
+            stats.frontier(len(frontier))
+
+    raise Exception("no solution")
 
 
 def person_id_for_name(name):
@@ -147,31 +781,62 @@ def person_id_for_name(name):
     resolving ambiguities as needed.
     """
     person_ids = list(names.get(name.lower(), set()))
+    if len(person_ids) == 0 and name_index is not None:
+        person_ids = [match[0] for match in name_index.search(name)]
+        if person_ids:
+            print(f"No exact match for '{name}'.")
+            return choose_person(name, person_ids)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+        return choose_person(name, person_ids)
     else:
         return person_ids[0]
 
 
+def choose_person(name, person_ids):
+    """Asks which of several person_ids was meant by name."""
+    print(f"Which '{name}'?")
+    for person_id in person_ids:
+        person = people[person_id]
+        name = person["name"]
+        birth = person["birth"]
+        print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    With the neighbor cache enabled the pairs come back as a cached
+    tuple, so repeated calls for a person allocate nothing.
     """
+    if neighbor_cache is not None:
+        neighbors = neighbor_cache.get(person_id)
+        if neighbors is not None:
+            neighbor_counts["hits"] += 1
+            return neighbors
+        neighbors = tuple(find_neighbors(person_id))
+        neighbor_cache.put(person_id, neighbors)
+    else:
+        neighbors = find_neighbors(person_id)
+    neighbor_counts["built"] += 1
+    neighbor_counts["pairs"] += len(neighbors)
+    return neighbors
+
+
+def find_neighbors(person_id):
+    """Builds the set of (movie_id, person_id) pairs for a person."""
+    if graph is not None:
+        return graph.neighbors(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,505 @@
+"""
+Compact storage for the degrees dataset.
+
+People and movies are interned to dense integer indexes and the
+bipartite star graph is kept in CSR form: for person i, the indexes
+of their movies are person_movies[person_offsets[i]:person_offsets[i + 1]],
+and likewise movie_stars / movie_offsets for the people in each movie.
+
+A StarGraph can be saved as a binary snapshot and memory-mapped back,
+so later runs skip parsing the CSV files altogether.
+"""
+
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Snapshot file written inside a dataset directory
+SNAPSHOT = "degrees.snapshot"
+
+# First bytes of every snapshot file
+MAGIC = b"DEGREES\x01"
+
+# Files whose sizes and modification times a snapshot is keyed on
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# StarGraph attributes stored in a snapshot
+TABLES = ("person_ids", "person_names", "person_births",
+          "movie_ids", "movie_titles", "movie_years")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars",
+          "person_order", "movie_order", "name_order")
+
+
+class StringTable():
+    """
+    Read-only sequence of strings packed into a single UTF-8 buffer.
+    String i is blob[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class TableBuilder():
+    """Appends rows of strings to a fixed number of packed columns."""
+
+    def __init__(self, width):
+        self.blobs = [bytearray() for _ in range(width)]
+        self.offsets = [array("q", [0]) for _ in range(width)]
+
+    def append(self, *strings):
+        for blob, offsets, string in zip(self.blobs, self.offsets, strings):
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+
+    def build(self):
+        """Returns one StringTable per column."""
+        return [StringTable(blob, offsets)
+                for blob, offsets in zip(self.blobs, self.offsets)]
+
+
+def positions(header, *names):
+    """Returns the column numbers of the named CSV columns."""
+    try:
+        return [header.index(name) for name in names]
+    except ValueError:
+        raise ValueError(f"CSV header {header} lacks one of {names}")
+
+
+def peak_memory_mb():
+    """Returns the peak resident memory of this process in MB, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+
+def csr(count, rows, columns):
+    """
+    Builds CSR offsets and adjacency for `count` rows from parallel
+    arrays of (row, column) edges.
+    """
+    offsets = array("q", bytes(8 * (count + 1)))
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    adjacency = array("i", bytes(4 * len(columns)))
+    position = array("q", offsets[:-1])
+    for row, column in zip(rows, columns):
+        adjacency[position[row]] = column
+        position[row] += 1
+    return offsets, adjacency
+
+
+def sorted_order(count, key):
+    """Returns an array of indexes 0..count-1 sorted by key(index)."""
+    return array("i", sorted(range(count), key=key))
+
+
+class StarGraph():
+    """
+    The people, movies and stars of a degrees dataset in CSR arrays.
+    Person and movie IMDb ids are looked up by binary search over
+    index arrays sorted by id.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_order, movie_order, name_order):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.person_order = person_order
+        self.movie_order = movie_order
+        self.name_order = name_order
+
+    @classmethod
+    def from_csv(cls, directory, metadata=True, stats=None):
+        """
+        Streams a dataset directory into a new StarGraph.
+
+        Rows are read positionally and every string goes straight into
+        its packed table, so only the id -> index dictionaries are held
+        as Python objects while loading. With metadata=False births,
+        titles and years are skipped and left empty. If a `stats`
+        dictionary is given it is filled with row counts, rows per
+        second and the peak resident memory of the process.
+        """
+        start = time.perf_counter()
+
+        people = TableBuilder(3)
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            columns = positions(next(reader), "id", "name", "birth")
+            for row in reader:
+                if not row:
+                    continue
+                person_id, name, birth = (row[i] for i in columns)
+                if person_id in person_index:
+                    continue
+                person_index[person_id] = len(person_index)
+                people.append(person_id, name, birth if metadata else "")
+
+        films = TableBuilder(3)
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            columns = positions(next(reader), "id", "title", "year")
+            for row in reader:
+                if not row:
+                    continue
+                movie_id, title, year = (row[i] for i in columns)
+                if movie_id in movie_index:
+                    continue
+                movie_index[movie_id] = len(movie_index)
+                films.append(movie_id, title if metadata else "",
+                             year if metadata else "")
+
+        star_people, star_movies = array("i"), array("i")
+        star_rows = 0
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            person_column, movie_column = positions(
+                next(reader), "person_id", "movie_id")
+            for row in reader:
+                if not row:
+                    continue
+                star_rows += 1
+                try:
+                    person = person_index[row[person_column]]
+                    movie = movie_index[row[movie_column]]
+                except KeyError:
+                    continue
+                star_people.append(person)
+                star_movies.append(movie)
+
+        # The ids are packed now; free the dictionaries before sorting
+        del person_index, movie_index
+        person_ids, person_names, person_births = people.build()
+        movie_ids, movie_titles, movie_years = films.build()
+
+        person_offsets, person_movies = csr(
+            len(person_ids), star_people, star_movies)
+        movie_offsets, movie_stars = csr(
+            len(movie_ids), star_movies, star_people)
+        del star_people, star_movies
+
+        graph = cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies, movie_offsets, movie_stars,
+            sorted_order(len(person_ids), person_ids.__getitem__),
+            sorted_order(len(movie_ids), movie_ids.__getitem__),
+            sorted_order(len(person_names),
+                         lambda i: person_names[i].lower()),
+        )
+
+        if stats is not None:
+            seconds = time.perf_counter() - start
+            rows = len(person_ids) + len(movie_ids) + star_rows
+            stats.update({
+                "people": len(person_ids),
+                "movies": len(movie_ids),
+                "stars": len(graph.person_movies),
+                "rows": rows,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds else None,
+                "peak_memory_mb": peak_memory_mb()
+            })
+        return graph
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-maps a snapshot written by save.
+        Returns the StarGraph and the source stamp it was saved with.
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a degrees snapshot")
+        header_length = int.from_bytes(view[8:16], "little")
+        header = json.loads(bytes(view[16:16 + header_length]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on another byte order")
+
+        data = align(16 + header_length)
+        sections = {}
+        end = data
+        for name, typecode, itemsize, start, length in header["sections"]:
+            if array(typecode).itemsize != itemsize:
+                raise ValueError(f"{path} was written on another platform")
+            start += data
+            if start + length > len(view):
+                raise ValueError(f"{path} is truncated")
+            try:
+                sections[name] = view[start:start + length].cast(typecode)
+            except TypeError:
+                raise ValueError(f"{path} has a misaligned section {name}")
+            end = max(end, align(start + length))
+
+        # save pads every section, so the file ends right after the last
+        if end != len(view):
+            raise ValueError(f"{path} is {len(view)} bytes, not {end}")
+
+        attributes = {name: sections[name] for name in ARRAYS}
+        for name in TABLES:
+            attributes[name] = StringTable(
+                sections[f"{name}.blob"], sections[f"{name}.offsets"])
+        return cls(**attributes), header["stamp"]
+
+    def save(self, path, stamp):
+        """
+        Writes the graph to a snapshot file, recording `stamp`
+        (see source_stamp) so stale snapshots can be detected.
+        """
+        sections = []
+        for name in TABLES:
+            table = getattr(self, name)
+            sections.append((f"{name}.blob", table.blob))
+            sections.append((f"{name}.offsets", table.offsets))
+        for name in ARRAYS:
+            sections.append((name, getattr(self, name)))
+
+        entries, buffers, position = [], [], 0
+        for name, buffer in sections:
+            buffer = memoryview(buffer)
+            raw = buffer.cast("B")
+            entries.append(
+                [name, buffer.format, buffer.itemsize, position, len(raw)])
+            buffers.append(raw)
+            position = align(position + len(raw))
+
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "stamp": stamp,
+            "sections": entries
+        }).encode("utf-8")
+
+        # Write to a temporary file first so readers never see half a file
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(bytes(align(f.tell()) - f.tell()))
+            for raw in buffers:
+                f.write(raw)
+                f.write(bytes(align(len(raw)) - len(raw)))
+        os.replace(temporary, path)
+
+    def person_count(self):
+        return len(self.person_offsets) - 1
+
+    def movie_count(self):
+        return len(self.movie_offsets) - 1
+
+    def person_index(self, person_id):
+        """Returns the index of an IMDb person id, or None."""
+        return find(self.person_order, self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """Returns the index of an IMDb movie id, or None."""
+        return find(self.movie_order, self.movie_ids, movie_id)
+
+    def movies_of(self, person):
+        """Returns the movie indexes of a person index."""
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """Returns the person indexes of a movie index."""
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[movie]:offsets[movie + 1]]
+
+    def people_named(self, name):
+        """Returns the indexes of people whose lowercased name is `name`."""
+        order = self.name_order
+        key = self.lowercase_name
+        start = bisect_left(order, name, key=key)
+        matches = []
+        for i in range(start, len(order)):
+            if key(order[i]) != name:
+                break
+            matches.append(order[i])
+        return matches
+
+    def lowercase_name(self, person):
+        return self.person_names[person].lower()
+
+    def neighbors(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(self.person_index(person_id)):
+            movie_id = self.movie_ids[movie]
+            for star in self.stars_of(movie):
+                neighbors.add((movie_id, self.person_ids[star]))
+        return neighbors
+
+
+def align(position):
+    """Rounds a byte position up to the next multiple of 8."""
+    return (position + 7) // 8 * 8
+
+
+def source_stamp(directory):
+    """Returns the sizes and modification times of a dataset's CSV files."""
+    stamp = {}
+    for name in SOURCES:
+        info = os.stat(os.path.join(directory, name))
+        stamp[name] = [info.st_size, info.st_mtime_ns]
+    return stamp
+
+
+def load_snapshot(directory, metadata=True, stats=None):
+    """
+    Returns the StarGraph for a dataset directory, mapping its snapshot
+    if the CSV files have not changed since it was written, and parsing
+    the CSV files and writing a fresh snapshot otherwise.
+    `metadata` and `stats` are passed on to StarGraph.from_csv.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    stamp = source_stamp(directory)
+    stamp["metadata"] = metadata
+    try:
+        graph, saved = StarGraph.load(path)
+        if saved == stamp:
+            return graph
+    except (OSError, ValueError, KeyError):
+        pass
+
+    graph = StarGraph.from_csv(directory, metadata=metadata, stats=stats)
+    try:
+        graph.save(path, stamp)
+    except OSError:
+        # A read-only dataset still loads, just without a snapshot
+        pass
+    return graph
+
+
+def find(order, ids, wanted):
+    """Binary searches `order` (sorted by ids[index]) for an id."""
+    i = bisect_left(order, wanted, key=ids.__getitem__)
+    if i < len(order) and ids[order[i]] == wanted:
+        return order[i]
+    return None
+
+
+class PeopleView(Mapping):
+    """
+    Read-only mapping from person_id to a dictionary of:
+    name, birth, movies (a set of movie_ids), backed by a StarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(person)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return self.graph.person_count()
+
+
+class MoviesView(Mapping):
+    """
+    Read-only mapping from movie_id to a dictionary of:
+    title, year, stars (a set of person_ids), backed by a StarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[p] for p in graph.stars_of(movie)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return self.graph.movie_count()
+
+
+class NamesView(Mapping):
+    """
+    Read-only mapping from lowercased names to a set of person_ids,
+    backed by a StarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        matches = graph.people_named(name)
+        if not matches:
+            raise KeyError(name)
+        return {graph.person_ids[person] for person in matches}
+
+    def __iter__(self):
+        graph = self.graph
+        previous = None
+        for person in graph.name_order:
+            name = graph.lowercase_name(person)
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,156 @@
+"""
+Landmark distance index for A* search with ALT lower bounds.
+
+Breadth-first distances from a few well-connected landmark people to
+everyone else bound the distance between any two people by the
+triangle inequality: d(v, t) >= |d(L, t) - d(L, v)| for every landmark L.
+"""
+
+import json
+
+# First bytes of every landmark index file; version 2 added the
+# person count and source stamp to the header
+MAGIC = b"LANDMRK\x02"
+
+# Stored distance of people a landmark cannot reach
+UNREACHED = 255
+
+# Largest distance stored exactly; longer distances saturate here
+SATURATED = 254
+
+
+class LandmarkIndex():
+    """
+    Distances from each landmark to every indexed person, one bytearray
+    per landmark in the order of `person_ids`. `stamp` identifies the
+    dataset the distances were measured on (see graph.source_stamp).
+    """
+
+    def __init__(self, landmarks, person_ids, distances, stamp=None):
+        self.landmarks = landmarks
+        self.person_ids = person_ids
+        self.distances = distances
+        self.stamp = stamp
+        self.index = {person_id: i for i, person_id in enumerate(person_ids)}
+
+    @classmethod
+    def build(cls, person_ids, degree, neighbors, count=8):
+        """
+        Builds an index over person_ids, picking `count` landmarks among
+        the people with the highest degree(person_id) and skipping anyone
+        who starred with an earlier landmark, so landmarks stay spread out.
+        `neighbors` is a function like neighbors_for_person.
+        """
+        person_ids = list(person_ids)
+        index = {person_id: i for i, person_id in enumerate(person_ids)}
+        candidates = sorted(person_ids, key=degree, reverse=True)
+
+        landmarks, distances = [], []
+        for candidate in candidates:
+            if len(landmarks) == count:
+                break
+            i = index[candidate]
+            if any(row[i] <= 1 for row in distances):
+                continue
+            landmarks.append(candidate)
+            distances.append(distances_from(candidate, index, neighbors))
+        return cls(landmarks, person_ids, distances)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save. Raises ValueError if the file is
+        damaged or truncated.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a landmark index")
+            header_length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_length))
+            person_ids = f.read(header["ids_bytes"]).decode("utf-8")
+            person_ids = person_ids.split("\n") if person_ids else []
+            if len(person_ids) != header["people"]:
+                raise ValueError(f"{path} is truncated")
+            distances = [bytearray(f.read(len(person_ids)))
+                         for _ in header["landmarks"]]
+            if (any(len(row) != len(person_ids) for row in distances)
+                    or f.read(1)):
+                raise ValueError(f"{path} has the wrong size")
+        return cls(header["landmarks"], person_ids, distances,
+                   header["stamp"])
+
+    def save(self, path):
+        """
+        Writes the index as MAGIC, an 8-byte header length, a JSON header,
+        the newline-separated person ids and one distance byte per
+        person for each landmark.
+        """
+        person_ids = "\n".join(self.person_ids).encode("utf-8")
+        header = json.dumps({
+            "landmarks": self.landmarks,
+            "people": len(self.person_ids),
+            "ids_bytes": len(person_ids),
+            "stamp": self.stamp
+        }).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(person_ids)
+            for row in self.distances:
+                f.write(row)
+
+    def bound_to(self, target):
+        """
+        Returns a function giving a lower bound on the distance from a
+        person to target, or None when the landmarks prove that person
+        cannot reach target at all.
+        """
+        t = self.index.get(target)
+        if t is None:
+            return lambda person_id: 0
+        rows = [(row, row[t]) for row in self.distances]
+        index = self.index
+
+        def bound(person_id):
+            v = index.get(person_id)
+            if v is None:
+                return 0
+            best = 0
+            for row, to_target in rows:
+                to_person = row[v]
+                if to_person == UNREACHED or to_target == UNREACHED:
+
+                    # A landmark reaching exactly one of the two people
+                    # shows they are in different components
+                    if to_person != to_target:
+                        return None
+                    continue
+                if to_person == SATURATED or to_target == SATURATED:
+                    continue
+                best = max(best, abs(to_target - to_person))
+            return best
+
+        return bound
+
+
+def distances_from(source, index, neighbors):
+    """
+    Returns a bytearray of breadth-first distances from source to every
+    person in index, saturating at SATURATED.
+    """
+    row = bytearray([UNREACHED]) * len(index)
+    row[index[source]] = 0
+    frontier = [source]
+    distance = 0
+    while frontier:
+        distance = min(distance + 1, SATURATED)
+        next_frontier = []
+        for person_id in frontier:
+            for _, neighbor in neighbors(person_id):
+                i = index.get(neighbor)
+                if i is not None and row[i] == UNREACHED:
+                    row[i] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return row
@@ -0,0 +1,148 @@
+"""
+Name lookup for the degrees dataset: exact, prefix and fuzzy matches.
+
+Prefix search bisects a sorted array of normalized names. Fuzzy search
+counts shared trigrams (three-character substrings) using an inverted
+index from each trigram to the people whose names contain it.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from heapq import nlargest
+
+# Most trigram postings read per fuzzy query; the rarest trigrams go first
+POSTINGS_BUDGET = 5_000
+
+# Fewest trigram posting lists read per fuzzy query, whatever the budget.
+# A single typo changes at most three trigrams, so four lists always
+# include one the intended name shares.
+MIN_LISTS = 4
+
+# Candidates re-scored exactly per fuzzy query
+RESCORE = 60
+
+# Lowest trigram similarity a fuzzy match may have
+MIN_SIMILARITY = 0.3
+
+
+def normalize(name):
+    """Lowercases a name and collapses runs of whitespace."""
+    return " ".join(name.lower().split())
+
+
+def trigrams(key):
+    """Returns the set of trigrams of a normalized name, padded at the ends."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Returns the Dice coefficient of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class NameIndex():
+    """
+    Ranked name search over (person_id, name, birth) entries.
+    Every search returns a list of (person_id, name, birth, score)
+    tuples, best first, where score 1.0 is an exact match.
+    """
+
+    def __init__(self, entries):
+        self.person_ids, self.names, self.births = [], [], []
+        for person_id, name, birth in entries:
+            self.person_ids.append(person_id)
+            self.names.append(name)
+            self.births.append(birth)
+        self.keys = [normalize(name) for name in self.names]
+
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.order = array("i", order)
+        self.sorted_keys = [self.keys[i] for i in order]
+
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, []).append(i)
+        self.postings = {
+            trigram: array("i", people) for trigram, people in postings.items()
+        }
+
+    def match(self, i, score):
+        return (self.person_ids[i], self.names[i], self.births[i], score)
+
+    def exact(self, name):
+        """Returns every person whose normalized name equals name's."""
+        key = normalize(name)
+        start = bisect_left(self.sorted_keys, key)
+        matches = []
+        for position in range(start, len(self.sorted_keys)):
+            if self.sorted_keys[position] != key:
+                break
+            matches.append(self.match(self.order[position], 1.0))
+        return matches
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` people whose normalized names start with
+        prefix, in alphabetical order, scored by how much of the name
+        the prefix covers.
+        """
+        key = normalize(prefix)
+        start = bisect_left(self.sorted_keys, key)
+        matches = []
+        for position in range(start, len(self.sorted_keys)):
+            name = self.sorted_keys[position]
+            if not name.startswith(key) or len(matches) == limit:
+                break
+            matches.append(
+                self.match(self.order[position], len(key) / len(name)))
+        return matches
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to `limit` people whose names share the most
+        trigrams with name, ranked by trigram similarity and leaving out
+        any less similar than MIN_SIMILARITY.
+        """
+        query = trigrams(normalize(name))
+        known = sorted(
+            (trigram for trigram in query if trigram in self.postings),
+            key=lambda trigram: len(self.postings[trigram])
+        )
+
+        # Count shared trigrams, reading the rarest posting lists first
+        hits = Counter()
+        budget = POSTINGS_BUDGET
+        for read, trigram in enumerate(known):
+            people = self.postings[trigram]
+            if read >= MIN_LISTS and len(people) > budget:
+                break
+            budget -= len(people)
+            hits.update(people)
+
+        # Re-score the strongest candidates against all of their trigrams
+        candidates = nlargest(RESCORE, hits, key=hits.get)
+        scored = []
+        for i in candidates:
+            score = similarity(query, trigrams(self.keys[i]))
+            if score >= MIN_SIMILARITY:
+                scored.append((score, self.keys[i], i))
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        return [self.match(i, score) for score, _, i in scored[:limit]]
+
+    def search(self, name, limit=10):
+        """
+        Returns up to `limit` candidates for name: exact matches,
+        then prefix matches, then fuzzy matches, without repeats.
+        """
+        matches, seen = [], set()
+        for match in (self.exact(name) + self.prefix(name, limit)
+                      + self.fuzzy(name, limit)):
+            if match[0] not in seen:
+                seen.add(match[0])
+                matches.append(match)
+        return matches[:limit]
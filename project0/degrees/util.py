@@ -1,3 +1,9 @@
+import json
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +42,174 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier with constant-time add, remove and contains_state.
+    Keeps a count of queued nodes per state alongside the deque.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.forget(node.state)
+            return node
+
+    def forget(self, state):
+        """Drops one queued occurrence of state from the state counts."""
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.forget(node.state)
+            return node
+
+
+class LRUCache():
+    """
+    Least-recently-used cache bounded by the total size of its values,
+    as measured by the `size` function.
+    """
+
+    def __init__(self, capacity, size=len):
+        self.capacity = capacity
+        self.size = size
+        self.entries = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key not in self.entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, value):
+        """Caches value, evicting the least recently used as needed."""
+        if key in self.entries:
+            self.used -= self.entries.pop(key)[1]
+        size = self.size(value)
+        if size > self.capacity:
+            return
+        while self.used + size > self.capacity:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.used -= evicted
+        self.entries[key] = (value, size)
+        self.used += size
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
+
+
+class SearchStats():
+    """
+    Instrumentation hook for search loops.
+
+    A search calls begin() before it starts, expanded() for every node it
+    takes off the frontier, frontier() with the frontier size after
+    adding children, duplicate() for every child it rejects as already
+    seen, and end() when it is done. report() then returns the numbers
+    for that query as a dictionary, and to_json() as one JSON line.
+
+    With trace_memory=True the memory high-water mark of each query is
+    measured with tracemalloc, which slows the search down.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.labels = {}
+
+        # Whether begin started tracemalloc, so end should stop it
+        self.started_tracing = False
+        self.reset()
+
+    def reset(self):
+        self.expansions = 0
+        self.duplicates = 0
+        self.peak_frontier = 0
+        self.slowest_expansion = 0.0
+        self.seconds = 0.0
+        self.peak_memory = None
+        self.started = self.last = time.perf_counter()
+
+    def begin(self, **labels):
+        """Starts timing a query; labels are included in its report."""
+        self.labels = labels
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self.started_tracing = True
+        self.reset()
+
+    def expanded(self):
+        now = time.perf_counter()
+        self.slowest_expansion = max(self.slowest_expansion, now - self.last)
+        self.last = now
+        self.expansions += 1
+
+    def frontier(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def duplicate(self):
+        self.duplicates += 1
+
+    def end(self, **labels):
+        """Stops timing a query; labels are added to its report."""
+        self.seconds = time.perf_counter() - self.started
+        self.labels.update(labels)
+        if self.trace_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def report(self):
+        report = dict(self.labels)
+        report.update({
+            "expanded": self.expansions,
+            "peak_frontier": self.peak_frontier,
+            "duplicates": self.duplicates,
+            "seconds": self.seconds,
+            "seconds_per_expansion": (
+                self.seconds / self.expansions if self.expansions else None),
+            "slowest_expansion": self.slowest_expansion,
+            "peak_memory_bytes": self.peak_memory
+        })
+        return report
+
+    def to_json(self):
+        return json.dumps(self.report())
@@ -0,0 +1,207 @@
+import random
+import sys
+import time
+
+import bitboard
+import tictactoe
+
+USAGE = ("Usage: python benchmark.py engines [positions] [seed]\n"
+         "       python benchmark.py deepening [seconds] [positions] [seed]\n"
+         "       python benchmark.py check [positions] [seed]")
+
+# Board sizes, k in a row and empty cells of the positions searched.
+# Full 5 x 5 games are out of reach for an exhaustive search.
+CONFIGS = [
+    (3, 3, 9),
+    (4, 3, 16),
+    (4, 4, 16),
+    (5, 4, 16),
+    (5, 5, 16),
+]
+
+# Board sizes and k in a row searched under a time budget
+DEEPENING_CONFIGS = [(5, 4), (6, 5), (7, 5)]
+
+# Board size, k in a row and empty cells of the positions whose
+# budgeted results are checked against an exhaustive search
+CHECK_CONFIG = (4, 3, 14)
+
+# Seconds given to the budgeted searches checked
+CHECK_BUDGETS = [0.005, 0.02, 0.1]
+
+
+def random_position(n, k, empty, rng):
+    """
+    Returns a bitboard position with `empty` empty cells, reached by
+    random moves, that nobody has won yet.
+    """
+    while True:
+        board = bitboard.initial_state(n, k)
+        while len(bitboard.actions(board)) > empty:
+            board = bitboard.result(board, rng.choice(sorted(
+                bitboard.actions(board))))
+        if not bitboard.terminal(board):
+            return board
+
+
+def benchmark_engines(args):
+    """
+    Times a cold 3 x 3 solve with both engines, then bitboard minimax
+    on random positions of each configuration in CONFIGS, clearing the
+    transposition table before every search.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    count = int(args[0]) if len(args) > 0 else 5
+    seed = int(args[1]) if len(args) > 1 else 0
+
+    # minimax would only look up the solution table, so time solve
+    tictactoe.cache_clear()
+    start = time.perf_counter()
+    tictactoe.solve(tictactoe.initial_state())
+    lists = time.perf_counter() - start
+
+    board = bitboard.initial_state()
+    board.geometry.table.clear()
+    start = time.perf_counter()
+    bitboard.minimax(board)
+    bits = time.perf_counter() - start
+    print(f"3 x 3 solve from the empty board: tictactoe {lists * 1000:.1f} ms, "
+          f"bitboard {bits * 1000:.1f} ms "
+          f"({bitboard.search_stats['nodes']} nodes)")
+
+    rng = random.Random(seed)
+    print(f"{'board':<8}{'k':>3}{'empty':>7}{'avg ms':>10}{'avg nodes':>12}")
+    for n, k, empty in CONFIGS:
+        seconds = nodes = 0
+        for _ in range(count):
+            board = random_position(n, k, empty, rng)
+            board.geometry.table.clear()
+            start = time.perf_counter()
+            bitboard.minimax(board)
+            seconds += time.perf_counter() - start
+            nodes += bitboard.search_stats["nodes"]
+        print(f"{f'{n} x {n}':<8}{k:>3}{empty:>7}"
+              f"{seconds / count * 1000:>10.1f}{nodes // count:>12}")
+
+
+def benchmark_deepening(args):
+    """
+    Runs budgeted minimax on random openings of larger boards, reporting
+    the depth each search completed and how long it really took.
+    """
+    if len(args) > 3:
+        sys.exit(USAGE)
+    budget = float(args[0]) if len(args) > 0 else 1.0
+    count = int(args[1]) if len(args) > 1 else 5
+    seed = int(args[2]) if len(args) > 2 else 0
+
+    rng = random.Random(seed)
+    print(f"{'board':<8}{'k':>3}{'budget s':>10}{'avg s':>8}{'max s':>8}"
+          f"{'avg depth':>11}{'avg nodes':>11}")
+    for n, k in DEEPENING_CONFIGS:
+        times, depths, nodes = [], 0, 0
+        for i in range(count):
+
+            # Start from the empty board, then from ever longer openings
+            board = random_position(n, k, n * n - i, rng)
+            board.geometry.table.clear()
+            start = time.perf_counter()
+            bitboard.minimax(board, budget)
+            times.append(time.perf_counter() - start)
+            depths += bitboard.search_stats["depth"]
+            nodes += bitboard.search_stats["nodes"]
+        print(f"{f'{n} x {n}':<8}{k:>3}{budget:>10.2f}"
+              f"{sum(times) / count:>8.2f}{max(times):>8.2f}"
+              f"{depths / count:>11.1f}{nodes // count:>11}")
+
+
+def outcome(board):
+    """
+    Returns 1, 0 or -1 as the player to move on a board wins, draws or
+    loses with best play, searching exhaustively on an empty table.
+    The transposition table is restored afterwards.
+    """
+    if bitboard.terminal(board):
+        return -1 if bitboard.winner(board) else 0
+    table = board.geometry.table
+    saved = dict(table)
+    table.clear()
+    bitboard.minimax(board)
+    value = bitboard.search_stats["value"]
+    table.clear()
+    table.update(saved)
+    return (value > 0) - (value < 0)
+
+
+def check_budgeted(args):
+    """
+    Checks the wins and losses budgeted minimax claims to have proven,
+    searching on a table left warm by earlier searches of the position
+    before, as runner.py does: a cut-short search, a budgeted one and an
+    exhaustive one. Moves from searches that ran out of time before
+    proving anything are estimates and are not checked. Exits with an
+    error if a claim is false or its move does not keep the result.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    count = int(args[0]) if len(args) > 0 else 20
+    seed = int(args[1]) if len(args) > 1 else 0
+
+    n, k, empty = CHECK_CONFIG
+    rng = random.Random(seed)
+    checked = wrong = 0
+    for _ in range(count):
+        parent = random_position(n, k, empty + 1, rng)
+        parent.geometry.table.clear()
+        bitboard.minimax(parent, stop=StoppedAfter(rng.randrange(50, 500)))
+        bitboard.minimax(parent, rng.choice(CHECK_BUDGETS))
+        bitboard.minimax(parent)
+        for action in sorted(bitboard.actions(parent)):
+            board = bitboard.result(parent, action)
+            if bitboard.terminal(board):
+                continue
+            move = bitboard.minimax(board, rng.choice(CHECK_BUDGETS))
+            value = bitboard.search_stats["value"]
+            if abs(value) < bitboard.WIN:
+                continue
+            claimed = 1 if value > 0 else -1
+            checked += 1
+            if (outcome(board) != claimed
+                    or -outcome(bitboard.result(board, move)) != claimed):
+                wrong += 1
+                print(f"{board}: move {move} does not keep the "
+                      f"{'win' if claimed > 0 else 'loss'} claimed at "
+                      f"depth {bitboard.search_stats['depth']}")
+    print(f"Checked {checked} proven budgeted moves, {wrong} wrong.")
+    if wrong:
+        sys.exit(1)
+
+
+class StoppedAfter():
+    """Stop event for minimax that is set once it has been polled enough."""
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    def is_set(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(USAGE)
+    command, args = sys.argv[1], sys.argv[2:]
+    if command == "engines":
+        benchmark_engines(args)
+    elif command == "deepening":
+        benchmark_deepening(args)
+    elif command == "check":
+        check_budgeted(args)
+    else:
+        sys.exit(USAGE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Tic Tac Toe Player on bitboards, for n x n boards with k in a row to win.
+
+Exposes the same functions as tictactoe.py, so runner.py can play with
+either. A board is two integers, one bit mask of marks per player, and
+the winning lines are precomputed as masks for each board size.
+"""
+
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Transposition table entry flags: the stored value is exact, or only a
+# lower or upper bound because the search was cut off
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Values of won positions start here, far above any heuristic estimate
+WIN = 1 << 20
+INFINITY = 1 << 30
+
+# Default seconds minimax may spend on a move; None searches to the end
+time_budget = None
+
+# Nodes searched between checks of the clock and the stop event
+CHECK_EVERY = 256
+
+# Transposition table entries a board size may carry into a search,
+# at roughly 230 bytes each; a larger table is emptied first
+TABLE_LIMIT = 500_000
+
+# Nodes visited, depth completed and value found by the last minimax call
+search_stats = {"nodes": 0, "depth": 0, "value": 0}
+
+
+class Geometry():
+    """
+    Winning line masks and move order of an n x n board with k in a row
+    to win, plus the transposition table of searches on it.
+    Cell (i, j) is bit i * n + j.
+    """
+
+    def __init__(self, n, k):
+        if not 1 <= k <= n:
+            raise ValueError("need 1 <= k <= n")
+        self.n = n
+        self.k = k
+        self.full = (1 << n * n) - 1
+
+        self.lines = []
+        for i in range(n):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < n and 0 <= end_j < n:
+                        mask = 0
+                        for step in range(k):
+                            mask |= 1 << ((i + step * di) * n + j + step * dj)
+                        self.lines.append(mask)
+        self.lines_through = [
+            [mask for mask in self.lines if mask >> cell & 1]
+            for cell in range(n * n)
+        ]
+
+        # Search central cells first; they lie on the most lines
+        center = (n - 1) / 2
+        self.order = sorted(
+            range(n * n),
+            key=lambda cell: (abs(cell // n - center) + abs(cell % n - center),
+                              cell)
+        )
+        self.table = {}
+
+
+geometries = {}
+
+
+def geometry(n, k):
+    """Returns the shared Geometry of an n x n board with k in a row."""
+    if (n, k) not in geometries:
+        geometries[(n, k)] = Geometry(n, k)
+    return geometries[(n, k)]
+
+
+class Board():
+    """
+    Immutable board position: x and o are the bit masks of each player's
+    marks. board[i] is row i as a list of X, O and EMPTY, as on the
+    list-of-lists boards of tictactoe.py.
+    """
+
+    __slots__ = ("x", "o", "geometry")
+
+    def __init__(self, x, o, geometry):
+        self.x = x
+        self.o = o
+        self.geometry = geometry
+
+    @property
+    def n(self):
+        return self.geometry.n
+
+    def __getitem__(self, i):
+        n = self.geometry.n
+        if not 0 <= i < n:
+            raise IndexError("row out of range")
+        row = []
+        for j in range(n):
+            bit = 1 << (i * n + j)
+            row.append(X if self.x & bit else O if self.o & bit else EMPTY)
+        return row
+
+    def __len__(self):
+        return self.geometry.n
+
+    def __eq__(self, other):
+        return (isinstance(other, Board) and self.x == other.x
+                and self.o == other.o and self.geometry is other.geometry)
+
+    def __hash__(self):
+        return hash((self.x, self.o, self.geometry.n, self.geometry.k))
+
+    def __repr__(self):
+        rows = ("".join(cell or "." for cell in self[i]) for i in range(self.n))
+        return f"Board({'/'.join(rows)}, k={self.geometry.k})"
+
+
+def initial_state(n=3, k=None):
+    """
+    Returns starting state of an n x n board with k in a row to win,
+    k defaulting to n.
+    """
+    return Board(0, 0, geometry(n, n if k is None else k))
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    X moves first, so it is X's turn whenever both have as many marks.
+    """
+    return X if board.x.bit_count() == board.o.bit_count() else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    n = board.geometry.n
+    taken = board.x | board.o
+    return {divmod(cell, n) for cell in range(n * n) if not taken >> cell & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    n = board.geometry.n
+    if not (0 <= i < n and 0 <= j < n):
+        raise Exception("invalid action")
+    bit = 1 << (i * n + j)
+    if (board.x | board.o) & bit:
+        raise Exception("invalid action")
+    if player(board) == X:
+        return Board(board.x | bit, board.o, board.geometry)
+    return Board(board.x, board.o | bit, board.geometry)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    for mask in board.geometry.lines:
+        if board.x & mask == mask:
+            return X
+        if board.o & mask == mask:
+            return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return (winner(board) is not None
+            or board.x | board.o == board.geometry.full)
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return {X: 1, O: -1, None: 0}[winner(board)]
+
+
+def minimax(board, budget=None, stop=None):
+    """
+    Returns the optimal action for the current player on the board,
+    preferring the quickest win and the slowest loss.
+
+    Without a time budget (seconds, defaulting to time_budget) or a stop
+    event (a threading.Event), the game tree is searched to the end.
+    Otherwise the search deepens one move at a time, estimating the
+    positions at its depth limit, and returns the best action of the
+    deepest search finished when time runs out or stop is set.
+    """
+    if terminal(board):
+        return None
+    if budget is None:
+        budget = time_budget
+    g = board.geometry
+    if len(g.table) > TABLE_LIMIT:
+        g.table.clear()
+    if player(board) == X:
+        me, them = board.x, board.o
+    else:
+        me, them = board.o, board.x
+    remaining = (g.full & ~(me | them)).bit_count()
+
+    deepening = budget is not None or stop is not None
+    search = Search(g, budget, stop, deepening)
+    depths = range(1, remaining + 1) if deepening else [remaining]
+
+    cell = None
+    for depth in depths:
+        try:
+            search.negamax(me, them, depth, -INFINITY, INFINITY, 0)
+        except SearchTimeout:
+            break
+        value, flag, cell = search.root
+        search_stats["depth"] = depth
+        search_stats["value"] = value
+
+        # A proven win or loss does not change with more depth
+        if flag == EXACT and abs(value) >= WIN:
+            break
+
+        # The first depth always finishes, so there is a move to return
+        search.checking = True
+    search_stats["nodes"] = search.nodes
+    return divmod(cell, g.n)
+
+
+def cache_clear():
+    """Empties the transposition tables of every board size."""
+    for g in geometries.values():
+        g.table.clear()
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time is up or it is stopped."""
+
+
+class Search():
+    """
+    One depth-limited alpha-beta search, with its clock and the killer
+    and history tables used to order moves while deepening. Searches to
+    the end do better with central cells first, so they skip the tables.
+    """
+
+    def __init__(self, g, budget=None, stop=None, deepening=True):
+        self.g = g
+        self.deepening = deepening
+        self.deadline = None if budget is None else time.perf_counter() + budget
+        self.stop = stop
+        self.checking = False
+        self.nodes = 0
+
+        # (value, flag, cell) of the root in the last search finished
+        self.root = None
+
+        # Killers: up to two moves per ply that caused a cutoff there.
+        # History: how much each cell has caused cutoffs anywhere.
+        self.killers = [[] for _ in range(g.n * g.n + 1)]
+        self.history = [0] * (g.n * g.n)
+
+    def out_of_time(self):
+        if self.stop is not None and self.stop.is_set():
+            return True
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def negamax(self, me, them, depth, alpha, beta, ply):
+        """
+        Returns the value of a position to the player to move, whose marks
+        are `me`, searching `depth` moves ahead. Won positions are worth
+        WIN plus the empty cells left after the win, lost ones the
+        negative of that, and a full board 0. At the depth limit the
+        position is estimated instead. The position must not be won yet.
+        """
+        g = self.g
+        self.nodes += 1
+        if self.checking and self.nodes % CHECK_EVERY == 0 and self.out_of_time():
+            raise SearchTimeout()
+
+        key = (me, them)
+        entry = g.table.get(key)
+        best_cell = None
+        if entry is not None:
+            value, flag, best_cell, searched = entry
+
+            # The root is always searched, so its move and value come
+            # from this search rather than an older bound
+            if searched >= depth and ply > 0:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        empty = g.full & ~(me | them)
+        if not empty:
+            return 0
+        remaining = empty.bit_count()
+        cells = [cell for cell in g.order if empty >> cell & 1]
+
+        # A win now beats any later one
+        for cell in cells:
+            mine = me | 1 << cell
+            for mask in g.lines_through[cell]:
+                if mine & mask == mask:
+                    self.store(key, WIN + remaining, EXACT, cell, remaining, ply)
+                    return WIN + remaining
+
+        if depth == 0:
+            return self.evaluate(me, them)
+
+        original_alpha = alpha
+        best = None
+        for cell in self.order(cells, best_cell, ply):
+            value = -self.negamax(them, me | 1 << cell, depth - 1,
+                                  -beta, -alpha, ply + 1)
+            if best is None or value > best:
+                best, best_cell = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if cell not in killers:
+                    killers.insert(0, cell)
+                    del killers[2:]
+                self.history[cell] += depth * depth
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(key, best, flag, best_cell, depth, ply)
+        return best
+
+    def store(self, key, value, flag, cell, depth, ply):
+        """
+        Records a search result in the transposition table unless a
+        deeper search of the position is already there, and as the
+        result of the root at ply 0.
+        """
+        table = self.g.table
+        entry = table.get(key)
+        if entry is None or depth >= entry[3]:
+            table[key] = (value, flag, cell, depth)
+        if ply == 0:
+            self.root = (value, flag, cell)
+
+    def order(self, cells, best_cell, ply):
+        """
+        Sorts moves: the best move of an earlier search first, then while
+        deepening this ply's killer moves, then by history, keeping
+        central cells first among equals.
+        """
+        if not self.deepening:
+            if best_cell is None:
+                return cells
+            return [best_cell] + [cell for cell in cells if cell != best_cell]
+        killers = self.killers[ply]
+        history = self.history
+        return sorted(cells, key=lambda cell: (
+            cell != best_cell, cell not in killers, -history[cell]))
+
+    def evaluate(self, me, them):
+        """
+        Estimates a position for the player to move: lines only they can
+        still complete count for them, 4 times more for every mark
+        already in the line, and lines only the opponent can complete
+        count against them.
+        """
+        score = 0
+        for mask in self.g.lines:
+            mine = me & mask
+            theirs = them & mask
+            if mine and not theirs:
+                score += 4 ** mine.bit_count()
+            elif theirs and not mine:
+                score -= 4 ** theirs.bit_count()
+        return max(-WIN + 1, min(WIN - 1, score))
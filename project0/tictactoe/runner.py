@@ -2,11 +2,30 @@ import pygame
 import sys
 import time
 
-import tictactoe as ttt
+from thinker import Thinker
+
+# python runner.py plays 3 x 3 with tictactoe.py; python runner.py n [k]
+# [seconds] plays on an n x n board with k in a row (default n) with
+# bitboard.py, giving the AI `seconds` per move (default 1)
+if len(sys.argv) > 1:
+    import bitboard as ttt
+    n = int(sys.argv[1])
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else n
+    ttt.time_budget = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    new_board = lambda: ttt.initial_state(n, k)
+else:
+    import tictactoe as ttt
+    n = 3
+    new_board = ttt.initial_state
 
 pygame.init()
 size = width, height = 600, 400
 
+# Frames drawn per second; the AI searches on a worker thread meanwhile
+FPS = 30
+clock = pygame.time.Clock()
+thinker = Thinker(ttt)
+
 # Colors
 black = (0, 0, 0)
 white = (255, 255, 255)
@@ -15,16 +34,20 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# The board always spans 240 pixels
+tile_size = 240 // n
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = new_board()
+ai_move = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            thinker.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -67,13 +90,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (n / 2 * tile_size),
+                       height / 2 - (n / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(n):
             row = []
-            for j in range(3):
+            for j in range(n):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -108,22 +130,22 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, searching replies ahead on the user's turn
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = thinker.move(board)
+            elif ai_move.done():
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
+        elif not game_over:
+            thinker.speculate(board)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(n):
+                for j in range(n):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
@@ -139,8 +161,10 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    thinker.cancel()
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    board = new_board()
+                    ai_move = None
 
     pygame.display.flip()
+    clock.tick(FPS)
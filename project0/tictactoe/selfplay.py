@@ -0,0 +1,185 @@
+"""
+Headless self-play for the tictactoe engines.
+
+Plays many games between minimax and random players across a process
+pool and writes a JSON report of outcomes, search speed and nodes
+visited per move. Keys are sorted and numbers rounded so that reports
+from two versions can be diffed.
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+# Players each side of a matchup can be
+PLAYERS = ("minimax", "random")
+
+# Matchups played by default, as "X player-O player"
+MATCHUPS = ("minimax-minimax", "minimax-random", "random-minimax")
+
+
+def load_engine(name):
+    """Imports the engine module tictactoe or bitboard."""
+    if name == "tictactoe":
+        import tictactoe as engine
+    elif name == "bitboard":
+        import bitboard as engine
+    else:
+        raise ValueError(f"unknown engine {name!r}")
+    return engine
+
+
+def warm_up(config):
+    """Loads the solution table, so no game's moves pay for reading it."""
+    engine = load_engine(config["engine"])
+    if config["engine"] == "tictactoe" and engine.solutions is None:
+        engine.load_solutions()
+
+
+def new_board(engine, config):
+    if config["engine"] == "bitboard":
+        return engine.initial_state(config["size"], config["k"])
+    return engine.initial_state()
+
+
+def play_game(task):
+    """
+    Plays one game. `task` is (config, matchup, seed). Returns the
+    winner ("X", "O" or "draw"), the number of moves and the count,
+    seconds and nodes of the minimax moves.
+    """
+    config, matchup, seed = task
+    engine = load_engine(config["engine"])
+    if config["engine"] == "bitboard":
+        engine.time_budget = config["budget"]
+
+    # Start every game on empty transposition tables, so its node counts
+    # do not depend on the games its worker happened to play before
+    engine.cache_clear()
+    players = dict(zip((engine.X, engine.O), matchup.split("-")))
+    rng = random.Random(seed)
+
+    board = new_board(engine, config)
+    game = {"moves": 0, "minimax_moves": 0, "seconds": 0.0, "nodes": 0,
+            "max_nodes": 0}
+    while not engine.terminal(board):
+        if players[engine.player(board)] == "minimax":
+            start = time.perf_counter()
+            action = engine.minimax(board)
+            game["seconds"] += time.perf_counter() - start
+            nodes = engine.search_stats["nodes"]
+            game["minimax_moves"] += 1
+            game["nodes"] += nodes
+            game["max_nodes"] = max(game["max_nodes"], nodes)
+        else:
+            action = rng.choice(sorted(engine.actions(board)))
+        board = engine.result(board, action)
+        game["moves"] += 1
+    game["winner"] = engine.winner(board) or "draw"
+    return game
+
+
+def summarize(games):
+    """Adds up the games of one matchup into its report entry."""
+    minimax_moves = sum(game["minimax_moves"] for game in games)
+    seconds = sum(game["seconds"] for game in games)
+    nodes = sum(game["nodes"] for game in games)
+    outcomes = {"X": 0, "O": 0, "draw": 0}
+    for game in games:
+        outcomes[game["winner"]] += 1
+    return {
+        "games": len(games),
+        "outcomes": outcomes,
+        "moves": sum(game["moves"] for game in games),
+        "minimax_moves": minimax_moves,
+        "minimax_seconds": round(seconds, 3),
+        "moves_per_second": significant(
+            minimax_moves / seconds if seconds else 0),
+        "nodes_per_move": round(nodes / minimax_moves, 2)
+        if minimax_moves else 0,
+        "max_nodes_per_move": max(game["max_nodes"] for game in games)
+    }
+
+
+def significant(number, digits=3):
+    """Rounds a number to a few significant digits for stable reports."""
+    return float(f"{number:.{digits}g}")
+
+
+def run(config, matchups, games, workers, seed):
+    """Plays `games` games of every matchup. Returns the report."""
+    tasks = [
+        (config, matchup, seed + i)
+        for matchup in matchups
+        for i in range(games)
+    ]
+    start = time.perf_counter()
+    if workers > 1:
+        with multiprocessing.Pool(workers, warm_up, (config,)) as pool:
+            results = pool.map(play_game, tasks, chunksize=64)
+    else:
+        warm_up(config)
+        results = [play_game(task) for task in tasks]
+    wall = time.perf_counter() - start
+
+    report = {"config": dict(config, games=games, seed=seed),
+              "matchups": {}}
+    for matchup in matchups:
+        played = [result for task, result in zip(tasks, results)
+                  if task[1] == matchup]
+        report["matchups"][matchup] = summarize(played)
+    report["games_per_second"] = significant(len(tasks) / wall)
+    return report
+
+
+def matchup(text):
+    """Parses an "X player-O player" matchup for argparse."""
+    sides = text.split("-")
+    if len(sides) != 2 or any(side not in PLAYERS for side in sides):
+        raise argparse.ArgumentTypeError(
+            f"expected player-player with players {', '.join(PLAYERS)}")
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play tictactoe engines against themselves and "
+                    "report outcomes and search speed as JSON.")
+    parser.add_argument("--engine", choices=("tictactoe", "bitboard"),
+                        default="tictactoe")
+    parser.add_argument("--size", type=int, default=3,
+                        help="board size for the bitboard engine")
+    parser.add_argument("--k", type=int,
+                        help="marks in a row to win (default: size)")
+    parser.add_argument("--budget", type=float,
+                        help="seconds per bitboard minimax move "
+                             "(default: search to the end)")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games per matchup")
+    parser.add_argument("--matchups", type=matchup, nargs="+",
+                        default=list(MATCHUPS))
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", metavar="FILE",
+                        help="write the report to FILE instead of stdout")
+    args = parser.parse_args()
+    if args.engine == "tictactoe" and (args.size != 3 or args.k or args.budget):
+        parser.error("--size, --k and --budget need --engine bitboard")
+
+    config = {"engine": args.engine, "size": args.size,
+              "k": args.k or args.size, "budget": args.budget}
+    report = run(config, args.matchups, args.games, args.workers, args.seed)
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
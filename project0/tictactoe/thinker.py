@@ -0,0 +1,156 @@
+"""
+Computes AI moves off the main thread for runner.py.
+
+One worker thread runs the engine's minimax, so the window keeps drawing
+while it searches. While the human picks a move, the worker also
+searches replies to their likeliest moves, so the reply to the move they
+make is often ready at once. Searches are cancelled through the stop
+event of bitboard.minimax; tictactoe.minimax answers from its solution
+table and needs none.
+"""
+
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Human moves whose replies are searched ahead of time
+SPECULATE = 4
+
+
+def key(board):
+    """Returns a hashable copy of a board of either engine."""
+    return tuple(tuple(row) for row in board)
+
+
+class Thinker():
+    """
+    Runs one engine's searches on a worker thread. move(board) returns a
+    Future of the AI's move; speculate(board) searches ahead while it is
+    the human's turn on board.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.cancellable = "stop" in inspect.signature(engine.minimax).parameters
+        self.lock = threading.Lock()
+
+        # Stop events of every search not cancelled yet
+        self.stops = set()
+
+        # Board key -> (future, stop) of queued or running speculative
+        # replies, and board key -> move of the finished ones
+        self.jobs = {}
+        self.replies = {}
+
+        # Bumped on every cancel, so older speculation is dropped
+        self.generation = 0
+
+        # Board being searched ahead on and the stop of its prediction
+        self.speculating = None
+        self.ahead = None
+
+    def search(self, board, stop):
+        """Returns the engine's move on board, stopping early if stop is set."""
+        try:
+            if self.cancellable:
+                return self.engine.minimax(board, stop=stop)
+            return self.engine.minimax(board)
+        finally:
+            with self.lock:
+                self.stops.discard(stop)
+
+    def submit(self, function, board, *args):
+        """Queues function(board, stop, *args). Returns (future, stop)."""
+        stop = threading.Event()
+        self.stops.add(stop)
+        return self.executor.submit(function, board, stop, *args), stop
+
+    def move(self, board):
+        """
+        Returns a Future of the AI's move on board: finished already if
+        it was searched ahead, the running speculative search if that is
+        the board it is on, and a new search otherwise. Any other
+        speculation is cancelled.
+        """
+        with self.lock:
+            board_key = key(board)
+            future = None
+            if board_key in self.replies:
+                future = Future()
+                future.set_result(self.replies[board_key])
+            elif board_key in self.jobs:
+                future = self.jobs.pop(board_key)[0]
+            self.cancel_locked()
+            if future is None:
+                future, _ = self.submit(self.search, board)
+            return future
+
+    def speculate(self, board):
+        """
+        Searches ahead while it is the human's turn on board: first the
+        move minimax would make for them, then replies to that move and
+        the next likeliest ones, central cells first. Does nothing if it
+        is already searching ahead on this board.
+        """
+        with self.lock:
+            board_key = key(board)
+            if self.speculating == board_key:
+                return
+            self.cancel_locked()
+            self.speculating = board_key
+            _, self.ahead = self.submit(self.look_ahead, board, self.generation)
+
+    def look_ahead(self, board, stop, generation):
+        """Predicts the human's move on board and queues replies to it."""
+        predicted = self.search(board, stop)
+        center = (len(board) - 1) / 2
+        likely = sorted(
+            self.engine.actions(board),
+            key=lambda action: (action != predicted,
+                                abs(action[0] - center) + abs(action[1] - center),
+                                action)
+        )
+        with self.lock:
+            if stop.is_set() or generation != self.generation:
+                return
+            for action in likely[:SPECULATE]:
+                child = self.engine.result(board, action)
+                if not self.engine.terminal(child):
+                    self.jobs[key(child)] = self.submit(
+                        self.reply, child, generation)
+
+    def reply(self, board, stop, generation):
+        """Searches the AI's reply on board, keeping it unless cancelled."""
+        move = self.search(board, stop)
+        with self.lock:
+            if not stop.is_set() and generation == self.generation:
+                self.replies[key(board)] = move
+                self.jobs.pop(key(board), None)
+        return move
+
+    def cancel(self):
+        """Cancels every search, including moves already asked for."""
+        with self.lock:
+            for stop in self.stops:
+                stop.set()
+            self.cancel_locked()
+
+    def cancel_locked(self):
+        """Cancels and forgets speculation. Needs the lock held."""
+        for future, stop in self.jobs.values():
+            future.cancel()
+            stop.set()
+            self.stops.discard(stop)
+        if self.ahead is not None:
+            self.ahead.set()
+            self.stops.discard(self.ahead)
+        self.jobs.clear()
+        self.replies.clear()
+        self.speculating = self.ahead = None
+        self.generation += 1
+
+    def shutdown(self):
+        """Cancels every search and stops the worker thread."""
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -3,12 +3,62 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
+import sys
+import time
+import zlib
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Solution table of every position, written by running this file
+SOLUTION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "tictactoe.table")
+
+# First bytes of a solution table file, ending in its format version
+SOLUTION_MAGIC = b"TTTSOLN\x01"
+
+# Table byte of positions that cannot be reached in a game
+UNREACHABLE = 0xFF
+
+# Table byte marking a position without a move, as low 4 bits
+NO_MOVE = 0x0F
+
+
+def symmetries():
+    """
+    Returns the 8 symmetries of the board (rotations and reflections) as
+    cell orders: symmetry `perm` maps a board to the one whose cell k
+    holds cell perm[k] of the original, numbering cells 0 to 8 by rows.
+    """
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = [0] * 9
+            for i in range(3):
+                for j in range(3):
+                    r, c = (i, 2 - j) if flip else (i, j)
+                    for _ in range(turns):
+                        r, c = c, 2 - r
+                    perm[3 * r + c] = 3 * i + j
+            perms.append(perm)
+    return perms
+
+
+SYMMETRIES = symmetries()
+
+# Transposition table: canonical board key -> (value, canonical cell of
+# the best move or None). Kept across moves and games.
+table = {}
+table_stats = {"hits": 0, "misses": 0}
+
+# Solution table loaded by load_solutions, or None until then
+solutions = None
+
+# Positions looked up by the last minimax call
+search_stats = {"nodes": 0}
+
 
 def initial_state():
     """
@@ -56,7 +106,7 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    board2 = copy.deepcopy(board)
+    board2 = [row[:] for row in board]
     # on the board fill in the players symbol
     # print(f"{action[0]} and {action[1]}")
     board2[action[0]][action[1]] = player(board)
@@ -72,29 +122,21 @@ def winner(board):
         if board[i][0] == board[i][1] == board[i][2]:
             if board[i][0] != None:
                 return board[i][0]
-            else:
-                return None
     # vertical
     for i in range(3):
         if board[0][i] == board[1][i] == board[2][i]:
             if board[0][i] != None:
                 return board[0][i]
-            else:
-                return None
 
     # diagonal 1
     if board[0][0] == board[1][1] == board[2][2]:
         if board[0][0] != None:
             return board[0][0]
-        else:
-            return None
 
     # diagonal 2
     if board[0][2] == board[1][1] == board[2][0]:
-        if board[0][0] != None:
+        if board[1][1] != None:
             return board[1][1]
-        else:
-            return None
     return None
 
 
@@ -138,60 +180,169 @@ def minimax(board):
     """
     if terminal(board):
         return None
-    Max = float("-inf")
-    Min = float("inf")
+    if solutions is None:
+        load_solutions()
+    code = solutions[encode(board)]
+    if code != UNREACHABLE:
+        search_stats["nodes"] = 1
+        return divmod(code & NO_MOVE, 3)
+
+    # Boards no game reaches are searched instead
+    lookups = table_stats["hits"] + table_stats["misses"]
+    action = solve(board)[1]
+    search_stats["nodes"] = table_stats["hits"] + table_stats["misses"] - lookups
+    return action
+
+
+def encode(board):
+    """
+    Returns the index of a board in the solution table: its cells as
+    the digits of a base-3 number, EMPTY 0, X 1 and O 2, row by row.
+    """
+    index = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            index = 3 * index + (0 if cell is EMPTY else 1 if cell == X else 2)
+    return index
+
+
+def build_solutions():
+    """
+    Returns the solution table: one byte for each of the 3^9 boards,
+    UNREACHABLE unless a game can reach the board, and otherwise the
+    value with best play plus 1 in bits 4-5 and the cell (3 * i + j) of
+    an optimal move, or NO_MOVE once the game is over, in bits 0-3.
+    """
+    codes = bytearray([UNREACHABLE]) * 3 ** 9
+    boards = [initial_state()]
+    while boards:
+        board = boards.pop()
+        index = encode(board)
+        if codes[index] != UNREACHABLE:
+            continue
+        value, action = solve(board)
+        cell = NO_MOVE if action is None else 3 * action[0] + action[1]
+        codes[index] = (value + 1) << 4 | cell
+        if action is not None:
+            boards.extend(result(board, move) for move in actions(board))
+    return codes
+
 
-    if player(board) == X:
-        # max_value returns the action that produces the highest min-value
-        return Max_Value(board, Max, Min)[1]
+def load_solutions(path=SOLUTION_FILE):
+    """
+    Loads the solution table from a file written by save_solutions,
+    building it in memory instead if the file is missing, damaged or
+    of another format version.
+    """
+    global solutions
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        data = b""
+    magic, codes = data[:len(SOLUTION_MAGIC)], data[len(SOLUTION_MAGIC):-4]
+    if (magic == SOLUTION_MAGIC and len(codes) == 3 ** 9
+            and zlib.crc32(codes).to_bytes(4, "little") == data[-4:]):
+        solutions = codes
     else:
-        # min_value returns the actions that produces the lowest max-value
-        return Min_Value(board, Max, Min)[1]
+        solutions = bytes(build_solutions())
+    return solutions
 
 
-def Max_Value(board, Max, Min):
+def save_solutions(path=SOLUTION_FILE):
     """
-    Returns the max value and associated action of the min_value function
+    Builds the solution table and writes it to a file: SOLUTION_MAGIC,
+    the table and its CRC-32, little-endian.
     """
-    move = None
-    # if done return
-    if terminal(board):
-        return [utility(board), None]
+    global solutions
+    solutions = bytes(build_solutions())
+    with open(path + ".tmp", "wb") as f:
+        f.write(SOLUTION_MAGIC)
+        f.write(solutions)
+        f.write(zlib.crc32(solutions).to_bytes(4, "little"))
+    os.replace(path + ".tmp", path)
 
-    v = float('-inf')
 
-    # go through each possible action and test it in Min_value.
-    # return the max value of the test results
-    for action in actions(board):
-        # 0 returns the value
-        test = Min_Value(result(board, action), Max, Min)[0]
-        Max = max(Max, test)
-        if test > v:
-            v = test
-            move = action
-        if Max >= Min:
-            break
-    return [v, move]
+def canonical(board):
+    """
+    Returns (key, perm) for a board: key is the smallest encoding of the
+    board under its 8 symmetries and perm the symmetry that gives it.
+    """
+    cells = [cell or "-" for row in board for cell in row]
+    return min(("".join(cells[k] for k in perm), perm) for perm in SYMMETRIES)
 
 
-def Min_Value(board, Max, Min):
+def solve(board):
+    """
+    Returns [value, action] for the board, where value is the utility
+    with best play by both sides and action an optimal move, or None
+    if the game is over. Every position searched is kept in the
+    transposition table, shared by all boards with the same symmetry.
     """
-    Returns the min value and associated action of the max_value functio n
+    key, perm = canonical(board)
+    if key in table:
+        table_stats["hits"] += 1
+    else:
+        table_stats["misses"] += 1
+        table[key] = search(board, perm)
+
+    # Map the move back from the canonical board to this one
+    value, cell = table[key]
+    if cell is None:
+        return [value, None]
+    return [value, divmod(perm[cell], 3)]
+
+
+def search(board, perm):
+    """
+    Returns the transposition table entry for a board, searching every
+    move: (value, canonical cell of the best move or None).
     """
-    move = None
-    # return if done
     if terminal(board):
-        return [utility(board), None]
-    v = float('inf')
-
-    # go through each possible action and test it in Max_value.
-    # return the min value of those results
-    for action in actions(board):
-        test = Max_Value(result(board, action), Max, Min)[0]
-        Min = min(Min, test)
-        if test < v:
-            v = test
-            move = action
-        if Max >= Min:
-            break
-    return [v, move]
+        return (utility(board), None)
+
+    # Ties go to the first move in row order, so play is repeatable
+    best, move = None, None
+    maximizing = player(board) == X
+    for action in sorted(actions(board)):
+        value = solve(result(board, action))[0]
+        if best is None or (value > best if maximizing else value < best):
+            best, move = value, action
+    return (best, perm.index(3 * move[0] + move[1]))
+
+
+def cache_info():
+    """Returns the hits, misses, size and hit rate of the transposition table."""
+    lookups = table_stats["hits"] + table_stats["misses"]
+    return {
+        "hits": table_stats["hits"],
+        "misses": table_stats["misses"],
+        "entries": len(table),
+        "hit_rate": table_stats["hits"] / lookups if lookups else 0.0
+    }
+
+
+def cache_clear():
+    """Empties the transposition table and resets its statistics."""
+    table.clear()
+    table_stats["hits"] = table_stats["misses"] = 0
+
+
+def main():
+    """Rebuilds the solution table file and reports how fast it loads."""
+    if len(sys.argv) != 1:
+        sys.exit("Usage: python tictactoe.py")
+    start = time.perf_counter()
+    save_solutions()
+    built = time.perf_counter() - start
+    reachable = sum(code != UNREACHABLE for code in solutions)
+    print(f"Built {SOLUTION_FILE} in {built * 1000:.0f} ms: "
+          f"{reachable} reachable positions, {len(solutions)} bytes.")
+
+    start = time.perf_counter()
+    load_solutions()
+    print(f"Loaded it in {(time.perf_counter() - start) * 1e6:.0f} us.")
+
+
+if __name__ == "__main__":
+    main()
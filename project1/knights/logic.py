@@ -1,3 +1,4 @@
+import heapq
 import itertools
 
 
@@ -225,8 +226,402 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
+class Solver():
+    """
+    SAT solver for sentences, used to check entailment without
+    enumerating every model.
+
+    Sentences are compiled to clauses in conjunctive normal form: each
+    symbol is a variable numbered from 1, a literal is a variable or its
+    negation, and compound subsentences get a new variable of their own
+    that is defined to be equivalent to them (the Tseitin encoding), so
+    the clauses grow linearly with the sentence. Clauses can be added
+    between calls to solve, and solve can assume literals for one call
+    only, keeping everything learned for later calls.
+
+    Search is conflict-driven clause learning: unit propagation over
+    two watched literals per clause, learning a clause from each
+    conflict and jumping back to where it forces a new assignment.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.names = [None]
+        self.clauses = []
+        self.watches = {}
+        self.ok = True
+
+        # Assignment per variable, with the decision level it was made at
+        # and the clause that forced it (None for decisions)
+        self.value = [None]
+        self.level = [0]
+        self.reason = [None]
+        self.trail = []
+        self.trail_levels = []
+        self.head = 0
+
+        # Variables to decide on, most involved in recent conflicts first
+        self.activity = [0.0]
+        self.bump = 1.0
+        self.order = []
+        self.phase = [False]
+
+        self.model = None
+
+    def variable(self, name):
+        """Returns the variable of a symbol, numbering new ones."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable(name)
+        return self.variables[name]
+
+    def new_variable(self, name=None):
+        self.names.append(name)
+        self.value.append(None)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        var = len(self.names) - 1
+        heapq.heappush(self.order, (0.0, var))
+        return var
+
+    def add(self, sentence):
+        """Adds the clauses asserting that a sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.add_clause([self.literal(disjunct)
+                             for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.add_clause([-self.literal(sentence.antecedent),
+                             self.literal(sentence.consequent)])
+        else:
+            self.add_clause([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to a sentence, adding the clauses
+        that define new variables for its compound parts.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+        elif isinstance(sentence, Or):
+            parts = [-self.literal(disjunct) for disjunct in sentence.disjuncts]
+        elif isinstance(sentence, Implication):
+            parts = [self.literal(sentence.antecedent),
+                     -self.literal(sentence.consequent)]
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            var = self.new_variable()
+            self.add_clause([-var, -left, right])
+            self.add_clause([-var, left, -right])
+            self.add_clause([var, left, right])
+            self.add_clause([var, -left, -right])
+            return var
+        else:
+            raise TypeError("must be a logical sentence")
+        if len(parts) == 1:
+            return parts[0] if isinstance(sentence, And) else -parts[0]
+
+        # var <=> all parts hold; an Or is the negation of all of its
+        # disjuncts failing, an implication of its antecedent holding
+        # and its consequent failing
+        var = self.new_variable()
+        for part in parts:
+            self.add_clause([-var, part])
+        self.add_clause([var] + [-part for part in parts])
+        return var if isinstance(sentence, And) else -var
+
+    def add_clause(self, literals):
+        """Adds a clause: a list of literals, at least one of them true."""
+        if not self.ok:
+            return
+        clause = []
+        for literal in literals:
+            value = self.literal_value(literal)
+            if value or -literal in clause:
+                return
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        """Stores a clause, watching its first two literals."""
+        self.clauses.append(clause)
+        index = len(self.clauses) - 1
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def literal_value(self, literal):
+        value = self.value[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.value[var] = literal > 0
+        self.level[var] = len(self.trail_levels)
+        self.reason[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a clause with one literal left.
+        Returns the index of a clause made false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if self.literal_value(clause[0]):
+                    kept.append(index)
+                    continue
+
+                # Watch another literal that is not false, if any
+                for k in range(2, len(clause)):
+                    if self.literal_value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.literal_value(clause[0]) is False:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict, asserting literal
+        first and a literal of the level to jump back to second, and
+        that level.
+        """
+        level = len(self.trail_levels)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in clause if literal is None else clause[1:]:
+                var = abs(other)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.activity[var] += self.bump
+                    heapq.heappush(self.order, (-self.activity[var], var))
+                    if self.level[var] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+
+            # Resolve on the latest literal of this level in the clause
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+
+        learned[0] = -literal
+        self.bump *= 1.05
+        if self.bump > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.bump *= 1e-100
+            self.order = [(-activity, var)
+                          for var, activity in enumerate(self.activity) if var]
+            heapq.heapify(self.order)
+        if len(learned) == 1:
+            return learned, 0
+        deepest = max(range(1, len(learned)),
+                      key=lambda k: self.level[abs(learned[k])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def backtrack(self, level):
+        """Undoes every assignment made above a decision level."""
+        if len(self.trail_levels) <= level:
+            return
+        start = self.trail_levels[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.phase[var] = literal > 0
+            self.value[var] = None
+            self.reason[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_levels[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the most activity, or None."""
+        while self.order:
+            activity, var = heapq.heappop(self.order)
+            if self.value[var] is None and -activity == self.activity[var]:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses, together with the assumed literals,
+        can all be true, keeping a satisfying model of the symbols in
+        self.model, and False otherwise.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        assumptions = list(assumptions)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_levels:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                continue
+
+            # Assumptions are the first decisions
+            literal = None
+            while len(self.trail_levels) < len(assumptions):
+                assumed = assumptions[len(self.trail_levels)]
+                value = self.literal_value(assumed)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.trail_levels.append(len(self.trail))
+                if value is None:
+                    literal = assumed
+                    break
+            if literal is None:
+                var = self.decide()
+                if var is None:
+                    self.model = {
+                        name: self.value[var]
+                        for name, var in self.variables.items()
+                    }
+                    self.backtrack(0)
+                    return True
+                self.trail_levels.append(len(self.trail))
+                literal = var if self.phase[var] else -var
+            self.assign(literal, None)
+
+
+class EntailmentSession():
+    """
+    Answers many entailment queries against one knowledge base, which is
+    compiled to clauses once. Clauses the solver learns, and every query
+    found entailed or refuted, are kept for later queries.
+    """
+
+    def __init__(self, knowledge):
+        self.solver = Solver()
+        self.solver.add(knowledge)
+        self.consistent = self.solver.solve()
+        self.answers = {}
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        self.solver.add(sentence)
+        self.consistent = self.solver.solve()
+
+        # Queries that were unknown may not be any more
+        self.answers = {
+            query: answer for query, answer in self.answers.items()
+            if answer is not None
+        }
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        return self.classify([query])[query] is True
+
+    def classify(self, queries):
+        """
+        Returns a dict mapping each query to True if the knowledge base
+        entails it, False if it entails its negation and None if it
+        entails neither. A knowledge base that cannot be true entails
+        every query.
+
+        Every model found along the way rules out each query it
+        disagrees with, so most queries are answered without a search
+        of their own.
+        """
+        queries = list(queries)
+        if not self.consistent:
+            return {query: True for query in queries}
+        pending = [query for query in dict.fromkeys(queries)
+                   if query not in self.answers]
+        literals = {query: self.solver.literal(query) for query in pending}
+        seen = {query: set() for query in pending}
+
+        def record(model):
+            for query in pending:
+                seen[query].add(query.evaluate(model))
+
+        if pending:
+            self.solver.solve()
+            record(self.solver.model)
+        for query in pending:
+            if len(seen[query]) == 2:
+                self.answers[query] = None
+                continue
+
+            # The query held in every model so far, or failed in all of
+            # them; look for a model where it goes the other way
+            value = next(iter(seen[query]))
+            literal = literals[query] if value else -literals[query]
+            if self.solver.solve([-literal]):
+                record(self.solver.model)
+                self.answers[query] = None
+            else:
+                self.solver.add_clause([literal])
+                self.answers[query] = value
+        return {query: self.answers[query] for query in queries}
+
+
 def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    """
+    Checks if knowledge base entails query: it does exactly when
+    knowledge and the negation of query cannot both be true.
+    """
+    solver = Solver()
+    solver.add(knowledge)
+    solver.add(Not(query))
+    return not solver.solve()
+
+
+def model_check_enumerate(knowledge, query):
+    """Checks if knowledge base entails query by enumerating every model."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
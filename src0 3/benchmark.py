@@ -0,0 +1,329 @@
+import math
+import multiprocessing
+import random
+import sys
+import time
+import tracemalloc
+
+import generate
+from maze import ALGORITHMS, Maze
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+USAGE = ("Usage: python benchmark.py algorithms [size] [seed]\n"
+         "       python benchmark.py grid [size] [seed]\n"
+         "       python benchmark.py suite [cells] [seed]\n"
+         "       python benchmark.py jps [size] [seeds]\n"
+         "       python benchmark.py replan [size] [batches] [edits] [seed]")
+
+# Maze files shipped with the project
+MAZE_FILES = ["maze1.txt", "maze2.txt", "maze3.txt"]
+
+
+def compare_algorithms(maze, algorithms):
+    """
+    Solves maze with every algorithm. Returns a dictionary mapping each
+    algorithm to its explored count, solution length and seconds.
+    """
+    results = {}
+    for algorithm in algorithms:
+        start = time.perf_counter()
+        try:
+            maze.solve(algorithm)
+            length = len(maze.solution[0])
+        except Exception:
+            length = None
+        results[algorithm] = {
+            "explored": maze.num_explored,
+            "length": length,
+            "seconds": time.perf_counter() - start
+        }
+    return results
+
+
+def report_algorithms(label, maze, algorithms):
+    """Compares algorithms on maze and prints a row for each."""
+    results = compare_algorithms(maze, algorithms)
+
+    # Breadth-first search and A* must both find a shortest path
+    if results["bfs"]["length"] != results["astar"]["length"]:
+        sys.exit(f"bfs and astar disagree on the shortest path in {label}.")
+
+    for algorithm in algorithms:
+        result = results[algorithm]
+        print(f"{label:<16}{algorithm:<9}{result['explored']:>12}"
+              f"{str(result['length']):>10}"
+              f"{result['seconds'] * 1000:>12.1f}")
+
+
+def benchmark_algorithms(args):
+    """
+    Compares every search algorithm on the maze files and on a
+    generated size x size maze.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    size = int(args[0]) if len(args) > 0 else 2000
+    seed = int(args[1]) if len(args) > 1 else 0
+
+    print(f"{'maze':<16}{'search':<9}{'explored':>12}"
+          f"{'length':>10}{'ms':>12}")
+    for filename in MAZE_FILES:
+        report_algorithms(filename, Maze(filename), ALGORITHMS)
+
+    start = time.perf_counter()
+    maze = Maze.from_text(generate.backtracker(size, size, seed))
+    print(f"Generated a {size} x {size} maze in "
+          f"{time.perf_counter() - start:.1f} s")
+    report_algorithms(f"{size}x{size}", maze, ALGORITHMS)
+
+
+def list_walls(contents):
+    """Returns the walls of a maze as lists of bools, one list per row."""
+    contents = contents.splitlines()
+    width = max(len(line) for line in contents)
+    return [[j < len(line) and line[j] not in "AB " for j in range(width)]
+            for line in contents]
+
+
+def timed(function, *args):
+    """Calls function. Returns (result, seconds taken)."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def traced(function, *args):
+    """
+    Calls function under tracemalloc.
+    Returns (result, bytes still allocated, peak bytes allocated).
+    """
+    tracemalloc.start()
+    result = function(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def benchmark_grid(args):
+    """
+    Compares the memory of the bit-packed wall grid against lists of
+    bools on a generated size x size maze, then times searches on it.
+    Time and memory are measured in separate runs since tracing
+    allocations slows everything down.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    size = int(args[0]) if len(args) > 0 else 2000
+    seed = int(args[1]) if len(args) > 1 else 0
+    contents = generate.backtracker(size, size, seed)
+    cells = size * size
+
+    print(f"{'walls':<12}{'build s':>10}{'MB':>10}{'bytes/cell':>12}")
+    layouts = [("lists", list_walls), ("packed", Maze.from_text)]
+    for layout, build in layouts:
+        _, seconds = timed(build, contents)
+        maze, current, _ = traced(build, contents)
+        print(f"{layout:<12}{seconds:>10.2f}{current / 2 ** 20:>10.1f}"
+              f"{current / cells:>12.3f}")
+
+    print(f"{'search':<12}{'solve s':>10}{'peak MB':>10}{'explored':>12}")
+    for algorithm in ["bfs", "astar"]:
+        _, seconds = timed(maze.solve, algorithm)
+        _, _, peak = traced(maze.solve, algorithm)
+        print(f"{algorithm:<12}{seconds:>10.2f}{peak / 2 ** 20:>10.1f}"
+              f"{maze.num_explored:>12}")
+
+
+def peak_rss_mb():
+    """Returns the peak resident memory of this process in MB, if known."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def solve_once(contents, algorithm):
+    """
+    Solves a maze once. Returns its explored count, solution length,
+    seconds and the memory in MB the search added to the process peak.
+    """
+    maze = Maze.from_text(contents)
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        maze.solve(algorithm)
+        length = len(maze.solution[0])
+    except Exception:
+        length = None
+    seconds = time.perf_counter() - start
+    after = peak_rss_mb()
+    return {
+        "explored": maze.num_explored,
+        "length": length,
+        "seconds": seconds,
+        "peak_mb": None if before is None else after - before
+    }
+
+
+def in_fresh_process(function, *args):
+    """Calls function in a newly started process so no memory is shared."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def benchmark_suite(args):
+    """
+    Generates a maze of about `cells` cells with every generator and
+    solves it with every algorithm, each in a fresh process, reporting
+    throughput (cells generated or expanded per second), explored cells
+    and the memory each search added on top of the loaded maze.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    cells = int(args[0]) if len(args) > 0 else 10 ** 6
+    seed = int(args[1]) if len(args) > 1 else 0
+
+    # An odd side length leaves no unused row or column of rooms
+    size = math.isqrt(cells) | 1
+
+    print(f"{'maze':<13}{'search':<9}{'explored':>11}{'length':>10}"
+          f"{'s':>9}{'per s':>11}{'peak MB':>9}")
+    for name, generator in generate.GENERATORS.items():
+        contents, seconds = timed(generator, size, size, seed)
+        print(f"{name:<13}{'generate':<9}{'':>11}{'':>10}{seconds:>9.2f}"
+              f"{size * size / seconds:>11.0f}")
+
+        results = {}
+        for algorithm in ALGORITHMS:
+            result = in_fresh_process(solve_once, contents, algorithm)
+            results[algorithm] = result
+            peak = result["peak_mb"]
+            print(f"{name:<13}{algorithm:<9}{result['explored']:>11}"
+                  f"{str(result['length']):>10}{result['seconds']:>9.2f}"
+                  f"{result['explored'] / result['seconds']:>11.0f}"
+                  f"{'-' if peak is None else f'{peak:.0f}':>9}")
+
+        # Breadth-first search and A* must both find a shortest path
+        if results["bfs"]["length"] != results["astar"]["length"]:
+            sys.exit(f"bfs and astar disagree on the shortest path "
+                     f"in the {name} maze.")
+
+
+def valid_path(maze):
+    """Returns whether the solution steps from start to goal on open cells."""
+    cells = [maze.start] + maze.solution[1]
+    for (r1, c1), (r2, c2) in zip(cells, cells[1:]):
+        if abs(r1 - r2) + abs(c1 - c2) != 1:
+            return False
+        if maze.walls.is_wall(maze.walls.index(r2, c2)):
+            return False
+    return cells[-1] == maze.goal
+
+
+def benchmark_jps(args):
+    """
+    Validates jump point search against breadth-first search on
+    generated size x size mazes, one per generator and seed, and
+    compares explored cells and time with BFS and A*.
+    """
+    if len(args) > 2:
+        sys.exit(USAGE)
+    size = int(args[0]) if len(args) > 0 else 1001
+    seeds = int(args[1]) if len(args) > 1 else 5
+    algorithms = ["bfs", "astar", "jps"]
+
+    print(f"{'maze':<13}{'search':<9}{'explored':>12}{'ms':>12}")
+    for name, generator in generate.GENERATORS.items():
+        totals = {
+            algorithm: {"explored": 0, "seconds": 0.0}
+            for algorithm in algorithms
+        }
+        for seed in range(seeds):
+            maze = Maze.from_text(generator(size, size, seed))
+            results = compare_algorithms(maze, algorithms)
+            if maze.solution is not None and not valid_path(maze):
+                sys.exit(f"jps returned a broken path in {name} seed {seed}.")
+            if results["jps"]["length"] != results["bfs"]["length"]:
+                sys.exit(f"jps and bfs disagree on the shortest path "
+                         f"in {name} seed {seed}.")
+            for algorithm in algorithms:
+                totals[algorithm]["explored"] += results[algorithm]["explored"]
+                totals[algorithm]["seconds"] += results[algorithm]["seconds"]
+
+        for algorithm in algorithms:
+            total = totals[algorithm]
+            print(f"{name:<13}{algorithm:<9}{total['explored'] // seeds:>12}"
+                  f"{total['seconds'] / seeds * 1000:>12.1f}")
+
+
+def benchmark_replan(args):
+    """
+    Toggles batches of random walls in a generated open field and
+    compares repairing the D* Lite plan against solving from scratch.
+    """
+    if len(args) > 4:
+        sys.exit(USAGE)
+    size = int(args[0]) if len(args) > 0 else 501
+    batches = int(args[1]) if len(args) > 1 else 20
+    edits = int(args[2]) if len(args) > 2 else 10
+    seed = int(args[3]) if len(args) > 3 else 0
+
+    maze = Maze.from_text(generate.open_field(size, size, seed))
+    _, seconds = timed(maze.solve, "dstar")
+    print(f"First D* Lite plan: {maze.num_explored} explored "
+          f"in {seconds * 1000:.1f} ms")
+
+    rng = random.Random(seed)
+    algorithms = ["dstar", "astar", "bfs"]
+    totals = {
+        algorithm: {"explored": 0, "seconds": 0.0}
+        for algorithm in algorithms
+    }
+    for _ in range(batches):
+        cells = []
+        while len(cells) < edits:
+            cell = (rng.randrange(size), rng.randrange(size))
+            if cell not in (maze.start, maze.goal):
+                cells.append(cell)
+        maze.toggle_walls(cells)
+
+        # D* Lite goes first, so it repairs exactly this batch of edits
+        results = compare_algorithms(maze, algorithms)
+        if results["dstar"]["length"] != results["bfs"]["length"]:
+            sys.exit("dstar and bfs disagree on the shortest path.")
+        for algorithm in algorithms:
+            totals[algorithm]["explored"] += results[algorithm]["explored"]
+            totals[algorithm]["seconds"] += results[algorithm]["seconds"]
+
+    print(f"{batches} batches of {edits} toggled walls "
+          f"in a {size} x {size} open field")
+    print(f"{'search':<12}{'explored':>12}{'avg ms':>12}")
+    for algorithm in algorithms:
+        total = totals[algorithm]
+        print(f"{algorithm:<12}{total['explored'] // batches:>12}"
+              f"{total['seconds'] / batches * 1000:>12.1f}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(USAGE)
+    command, args = sys.argv[1], sys.argv[2:]
+    if command == "algorithms":
+        benchmark_algorithms(args)
+    elif command == "grid":
+        benchmark_grid(args)
+    elif command == "suite":
+        benchmark_suite(args)
+    elif command == "jps":
+        benchmark_jps(args)
+    elif command == "replan":
+        benchmark_replan(args)
+    else:
+        sys.exit(USAGE)
+
+
+if __name__ == "__main__":
+    main()
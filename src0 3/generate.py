@@ -0,0 +1,149 @@
+"""
+Seeded maze generators writing the text format maze.py reads.
+
+The backtracker and Prim's mazes put rooms on the odd rows and columns
+of the grid and knock down the walls between them as they are carved;
+open fields scatter single-cell obstacles instead. The start is always
+at the top left and the goal at the bottom right.
+"""
+
+import random
+import sys
+
+USAGE = ("Usage: python generate.py backtracker|prim|open "
+         "height width [seed] > maze.txt")
+
+# Share of cells that are walls in an open field
+OBSTACLE_DENSITY = 0.25
+
+
+def backtracker(height, width, seed=0):
+    """
+    Returns the text of a height x width maze carved by a randomized
+    depth-first search (the recursive backtracker, with an explicit
+    stack). The maze is perfect: exactly one path joins any two rooms.
+    """
+    rows, cols = room_counts(height, width)
+    rng = random.Random(seed)
+    grid = [bytearray(b"#") * width for _ in range(height)]
+
+    grid[1][1] = ord(" ")
+    stack = [(1, 1)]
+    while stack:
+        i, j = stack[-1]
+        unvisited = [
+            (i + di, j + dj)
+            for di, dj in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < i + di < 2 * rows and 0 < j + dj < 2 * cols
+            and grid[i + di][j + dj] == ord("#")
+        ]
+        if not unvisited:
+            stack.pop()
+            continue
+        r, c = rng.choice(unvisited)
+        grid[(i + r) // 2][(j + c) // 2] = ord(" ")
+        grid[r][c] = ord(" ")
+        stack.append((r, c))
+
+    return place_ends(grid, rows, cols)
+
+
+def prim(height, width, seed=0):
+    """
+    Returns the text of a height x width maze carved by randomized
+    Prim's algorithm: the maze grows from the first room by opening a
+    random wall on its boundary at a time. The maze is perfect, with
+    many short dead ends instead of the backtracker's long corridors.
+    """
+    rows, cols = room_counts(height, width)
+    rng = random.Random(seed)
+    grid = [bytearray(b"#") * width for _ in range(height)]
+
+    # Walls on the boundary, as (wall row, wall col, room row, room col)
+    boundary = []
+
+    def visit(i, j):
+        grid[i][j] = ord(" ")
+        for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = i + 2 * di, j + 2 * dj
+            if 0 < r < 2 * rows and 0 < c < 2 * cols and grid[r][c] == ord("#"):
+                boundary.append((i + di, j + dj, r, c))
+
+    visit(1, 1)
+    while boundary:
+
+        # Remove a random boundary wall by swapping it to the end
+        k = rng.randrange(len(boundary))
+        boundary[k], boundary[-1] = boundary[-1], boundary[k]
+        wall_i, wall_j, i, j = boundary.pop()
+        if grid[i][j] == ord("#"):
+            grid[wall_i][wall_j] = ord(" ")
+            visit(i, j)
+
+    return place_ends(grid, rows, cols)
+
+
+def open_field(height, width, seed=0, density=OBSTACLE_DENSITY):
+    """
+    Returns the text of a height x width field where each cell is a wall
+    with probability `density`. The cells around the start and goal are
+    kept clear, but the field is not guaranteed to be solvable.
+    """
+    if height * width < 2:
+        raise ValueError("maze needs room for a start and a goal")
+    rng = random.Random(seed)
+    wall, space = ord("#"), ord(" ")
+    grid = [
+        bytearray(wall if rng.random() < density else space
+                  for _ in range(width))
+        for _ in range(height)
+    ]
+    for i, j in ((0, 0), (0, 1), (1, 0),
+                 (height - 1, width - 1), (height - 2, width - 1),
+                 (height - 1, width - 2)):
+        if 0 <= i < height and 0 <= j < width:
+            grid[i][j] = space
+    grid[0][0] = ord("A")
+    grid[height - 1][width - 1] = ord("B")
+    return to_text(grid)
+
+
+# Generators by name, each called as generator(height, width, seed)
+GENERATORS = {
+    "backtracker": backtracker,
+    "prim": prim,
+    "open": open_field,
+}
+
+
+def room_counts(height, width):
+    """Returns how many rows and columns of rooms fit in the grid."""
+    rows, cols = (height - 1) // 2, (width - 1) // 2
+    if rows < 1 or cols < 1 or rows * cols < 2:
+        raise ValueError("maze needs room for a start and a goal")
+    return rows, cols
+
+
+def place_ends(grid, rows, cols):
+    """Marks the first and last rooms as start and goal; returns the text."""
+    grid[1][1] = ord("A")
+    grid[2 * rows - 1][2 * cols - 1] = ord("B")
+    return to_text(grid)
+
+
+def to_text(grid):
+    """Joins rows of maze characters into the text of a maze file."""
+    return "\n".join(row.decode("ascii") for row in grid) + "\n"
+
+
+def main():
+    if not 4 <= len(sys.argv) <= 5 or sys.argv[1] not in GENERATORS:
+        sys.exit(USAGE)
+    generator = GENERATORS[sys.argv[1]]
+    height, width = int(sys.argv[2]), int(sys.argv[3])
+    seed = int(sys.argv[4]) if len(sys.argv) == 5 else 0
+    sys.stdout.write(generator(height, width, seed))
+
+
+if __name__ == "__main__":
+    main()
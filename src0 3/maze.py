@@ -1,6 +1,15 @@
-import sys
+import argparse
+import heapq
+import json
+import math
+import re
+import time
+import tracemalloc
+from collections import deque
 
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -39,13 +48,417 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class DequeStackFrontier():
+    """
+    Stack frontier with constant-time add, remove and contains_state.
+    Keeps a count of queued nodes per state alongside the deque.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.forget(node.state)
+            return node
+
+    def forget(self, state):
+        """Drops one queued occurrence of state from the state counts."""
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.forget(node.state)
+            return node
+
+
+class PriorityFrontier():
+    """
+    Frontier that removes the node with the lowest priority first,
+    kept in a binary heap. Adding a queued state again with a lower
+    priority replaces it; the old heap entry is skipped when it surfaces.
+    """
+
+    def __init__(self):
+        self.frontier = []
+        self.priorities = {}
+        self.added = 0
+
+    def add(self, node, priority):
+        self.priorities[node.state] = priority
+
+        # The insertion count breaks ties first in, first out
+        self.added += 1
+        heapq.heappush(self.frontier, (priority, self.added, node))
+
+    def contains_state(self, state):
+        return state in self.priorities
+
+    def priority(self, state):
+        """Returns the priority state is queued with, or None."""
+        return self.priorities.get(state)
+
+    def empty(self):
+        return len(self.priorities) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            priority, _, node = heapq.heappop(self.frontier)
+            if self.priorities.get(node.state) == priority:
+                del self.priorities[node.state]
+                return node
+
+
+class Grid():
+    """
+    Walls of a maze packed one bit per cell into a bytearray.
+
+    Cells are addressed by flat index, row by row, and a border of walls
+    surrounds the maze so every neighbor of an open cell is on the grid.
+    """
+
+    def __init__(self, height, width, bits):
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+        self.bits = bits
+        self.steps = (
+            ("up", -self.stride),
+            ("down", self.stride),
+            ("left", -1),
+            ("right", 1)
+        )
+
+    @classmethod
+    def from_rows(cls, rows, width):
+        """
+        Builds a grid from strings of "1" (wall) and "0" (open) per row,
+        treating cells past the end of a short row as open.
+        """
+        border = "1" * (width + 2)
+        cells = [border]
+        for row in rows:
+            cells.append("1" + row.ljust(width, "0") + "1")
+        cells.append(border)
+
+        # Cell i is bit i % 8 of byte i // 8
+        cells = "".join(cells)
+        bits = int(cells[::-1], 2).to_bytes((len(cells) + 7) // 8, "little")
+        return cls(len(rows), width, bytearray(bits))
+
+    def index(self, row, col):
+        """Returns the flat index of the cell at row, col."""
+        return (row + 1) * self.stride + col + 1
+
+    def cell(self, index):
+        """Returns the (row, col) of the cell at a flat index."""
+        row, col = divmod(index, self.stride)
+        return (row - 1, col - 1)
+
+    def is_wall(self, index):
+        return self.bits[index >> 3] >> (index & 7) & 1
+
+    def set_wall(self, index, wall):
+        if wall:
+            self.bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self.bits[index >> 3] &= ~(1 << (index & 7))
+
+    def moves(self, index):
+        """Returns (action, index) for each open cell next to a cell."""
+        bits = self.bits
+        result = []
+        for action, step in self.steps:
+            neighbor = index + step
+            if not bits[neighbor >> 3] >> (neighbor & 7) & 1:
+                result.append((action, neighbor))
+        return result
+
+    def rows(self):
+        """Yields each row of the maze as a list of wall flags."""
+        for row in range(self.height):
+            start = self.index(row, 0)
+            yield [bool(self.is_wall(i)) for i in range(start, start + self.width)]
+
+
+def manhattan(state, goal):
+    """Number of moves from state to goal if there were no walls."""
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+
+def euclidean(state, goal):
+    """Straight-line distance from state to goal."""
+    return math.hypot(state[0] - goal[0], state[1] - goal[1])
+
+
+def zero(state, goal):
+    """No estimate at all, which turns A* into uniform-cost search."""
+    return 0
+
+
+# Heuristics selectable from the command line. A* finds shortest paths
+# with any heuristic that never overestimates and never drops by more
+# than one per move, as all of these do.
+HEURISTICS = {
+    "manhattan": manhattan,
+    "euclidean": euclidean,
+    "zero": zero,
+}
+
+# Search algorithms Maze.solve can run
+ALGORITHMS = ("dfs", "bfs", "greedy", "astar", "jps", "dstar")
+
+# Distance of cells that cannot reach the goal
+INFINITY = float("inf")
+
+
+class DStarLite():
+    """
+    Incremental shortest path planner for a maze (D* Lite).
+
+    Searches backward from the goal, keeping between calls each cell's
+    distance to the goal (g) and a one-step lookahead of it (rhs). After
+    walls change, only the cells whose distance may have changed are
+    searched again. Cells are flat indices of the maze's wall grid.
+    """
+
+    def __init__(self, maze, heuristic=manhattan):
+        self.maze = maze
+        self.walls = maze.walls
+        self.heuristic = heuristic
+        self.start = self.walls.index(*maze.start)
+        self.goal = self.walls.index(*maze.goal)
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.queue = []
+        self.queued = {}
+        self.num_explored = 0
+        self.explored = set()
+        self.queue_cell(self.goal)
+
+    def key(self, index):
+        """
+        Returns the queue priority of a cell. The search runs backward,
+        so the heuristic estimates the distance to the start.
+        """
+        distance = min(self.g.get(index, INFINITY),
+                       self.rhs.get(index, INFINITY))
+        estimate = self.heuristic(self.walls.cell(index), self.maze.start)
+        return (distance + estimate, distance)
+
+    def queue_cell(self, index):
+        key = self.key(index)
+        self.queued[index] = key
+        heapq.heappush(self.queue, (key, index))
+
+    def update_cell(self, index):
+        """Recomputes the rhs of a cell and queues it if it is inconsistent."""
+        walls = self.walls
+        if index != self.goal:
+            if walls.is_wall(index):
+                rhs = INFINITY
+            else:
+                rhs = 1 + min((self.g.get(neighbor, INFINITY)
+                               for _, neighbor in walls.moves(index)),
+                              default=INFINITY)
+            self.rhs[index] = rhs
+
+        # Any older heap entry for the cell is skipped when it surfaces
+        self.queued.pop(index, None)
+        if self.g.get(index, INFINITY) != self.rhs.get(index, INFINITY):
+            self.queue_cell(index)
+
+    def walls_changed(self, indices):
+        """Marks the cells next to changed walls for the next repair."""
+        for index in indices:
+            self.update_cell(index)
+            for _, neighbor in self.walls.moves(index):
+                self.update_cell(neighbor)
+
+    def repair(self, stats=None):
+        """
+        Updates distances until the start's is correct, counting the cells
+        expanded in self.num_explored and self.explored.
+        """
+        self.num_explored = 0
+        self.explored = set()
+        queue, queued, g, rhs = self.queue, self.queued, self.g, self.rhs
+        start = self.start
+        while queue:
+            key, index = queue[0]
+            if queued.get(index) != key:
+                heapq.heappop(queue)
+                continue
+            if (key >= self.key(start)
+                    and g.get(start, INFINITY) == rhs.get(start, INFINITY)):
+                break
+
+            heapq.heappop(queue)
+            del queued[index]
+            self.num_explored += 1
+            self.explored.add(index)
+            if stats is not None:
+                stats.expanded()
+
+            if g.get(index, INFINITY) > rhs.get(index, INFINITY):
+
+                # The cell got closer to the goal: settle it
+                g[index] = rhs[index]
+            else:
+
+                # The cell got further away: reopen it and let it settle again
+                g[index] = INFINITY
+                self.update_cell(index)
+            for _, neighbor in self.walls.moves(index):
+                self.update_cell(neighbor)
+            if stats is not None:
+                stats.frontier(len(queued))
+
+    def path(self):
+        """Returns the (actions, cells) of a shortest path to the goal."""
+        g, walls = self.g, self.walls
+        if g.get(self.start, INFINITY) == INFINITY:
+            raise Exception("no solution")
+        actions = []
+        cells = []
+        index = self.start
+        while index != self.goal:
+            action, index = min(
+                walls.moves(index),
+                key=lambda move: g.get(move[1], INFINITY)
+            )
+            actions.append(action)
+            cells.append(walls.cell(index))
+        return (actions, cells)
+
+
+class SearchStats():
+    """
+    Instrumentation hook for search loops.
+
+    A search calls begin() before it starts, expanded() for every node it
+    takes off the frontier, frontier() with the frontier size after
+    adding children, duplicate() for every child it rejects as already
+    seen, and end() when it is done. report() then returns the numbers
+    for that query as a dictionary, and to_json() as one JSON line.
+
+    With trace_memory=True the memory high-water mark of each query is
+    measured with tracemalloc, which slows the search down.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.labels = {}
+
+        # Whether begin started tracemalloc, so end should stop it
+        self.started_tracing = False
+        self.reset()
+
+    def reset(self):
+        self.expansions = 0
+        self.duplicates = 0
+        self.peak_frontier = 0
+        self.slowest_expansion = 0.0
+        self.seconds = 0.0
+        self.peak_memory = None
+        self.started = self.last = time.perf_counter()
+
+    def begin(self, **labels):
+        """Starts timing a query; labels are included in its report."""
+        self.labels = labels
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self.started_tracing = True
+        self.reset()
+
+    def expanded(self):
+        now = time.perf_counter()
+        self.slowest_expansion = max(self.slowest_expansion, now - self.last)
+        self.last = now
+        self.expansions += 1
+
+    def frontier(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def duplicate(self):
+        self.duplicates += 1
+
+    def end(self, **labels):
+        """Stops timing a query; labels are added to its report."""
+        self.seconds = time.perf_counter() - self.started
+        self.labels.update(labels)
+        if self.trace_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def report(self):
+        report = dict(self.labels)
+        report.update({
+            "expanded": self.expansions,
+            "peak_frontier": self.peak_frontier,
+            "duplicates": self.duplicates,
+            "seconds": self.seconds,
+            "seconds_per_expansion": (
+                self.seconds / self.expansions if self.expansions else None),
+            "slowest_expansion": self.slowest_expansion,
+            "peak_memory_bytes": self.peak_memory
+        })
+        return report
+
+    def to_json(self):
+        return json.dumps(self.report())
+
+
 class Maze():
 
     def __init__(self, filename):
 
         # Read file and set height and width of maze
         with open(filename) as f:
-            contents = f.read()
+            self.parse(f.read())
+
+    @classmethod
+    def from_text(cls, contents):
+        """Returns the maze drawn in a string, as in a maze file."""
+        maze = cls.__new__(cls)
+        maze.parse(contents)
+        return maze
+
+    def parse(self, contents):
+        """Reads the walls, start and goal from the text of a maze."""
 
         # Validate start and goal
         if contents.count("A") != 1:
@@ -58,33 +471,24 @@ class Maze():
         self.height = len(contents)
         self.width = max(len(line) for line in contents)
 
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        # Keep track of walls: A, B and spaces are open, all else is wall
+        rows = []
+        for i, line in enumerate(contents):
+            if "A" in line:
+                self.start = (i, line.index("A"))
+            if "B" in line:
+                self.goal = (i, line.index("B"))
+            rows.append(re.sub("[AB ]", "0", re.sub("[^AB ]", "1", line)))
+        self.walls = Grid.from_rows(rows, self.width)
 
         self.solution = None
+        self.planner = None
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = set(self.solution[1]) if self.solution is not None else None
         print()
-        for i, row in enumerate(self.walls):
+        for i, row in enumerate(self.walls.rows()):
             for j, col in enumerate(row):
                 if col:
                     print("█", end="")
@@ -100,35 +504,110 @@ class Maze():
         print()
 
 
-    def neighbors(self, state):
-        row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
-
-        result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
-        return result
+    def set_walls(self, edits):
+        """
+        Applies (row, col, wall) edits, building a wall where wall is
+        true and clearing one otherwise, and tells the incremental
+        planner which cells changed. Returns the number of cells changed.
+        """
+        changed = []
+        for row, col, wall in edits:
+            if not (0 <= row < self.height and 0 <= col < self.width):
+                raise ValueError(f"cell {(row, col)} is outside the maze")
+            if wall and (row, col) in (self.start, self.goal):
+                raise ValueError("cannot build a wall on the start or goal")
+            index = self.walls.index(row, col)
+            if bool(self.walls.is_wall(index)) != bool(wall):
+                self.walls.set_wall(index, wall)
+                changed.append(index)
 
+        self.solution = None
+        if self.planner is not None:
+            self.planner.walls_changed(changed)
+        return len(changed)
+
+    def toggle_walls(self, cells):
+        """Turns each (row, col) cell from wall to open or back."""
+        return self.set_walls(
+            (row, col, not self.walls.is_wall(self.walls.index(row, col)))
+            for row, col in cells
+        )
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def neighbors(self, state):
+        walls = self.walls
+        return [(action, walls.cell(index))
+                for action, index in walls.moves(walls.index(*state))]
+
+
+    def solve(self, algorithm="dfs", heuristic=manhattan, stats=None):
+        """
+        Finds a solution to maze, if one exists.
+        The search runs on flat cell indices of the wall grid, which is
+        what self.explored holds; the solution lists (row, col) cells.
+
+        `algorithm` is one of ALGORITHMS: depth-first search, breadth-first
+        search, greedy best-first search, A* search, jump point search or
+        D* Lite. The last four rank cells by heuristic(state, goal), an
+        estimate of the moves left. D* Lite keeps its search state in
+        self.planner and only repairs it after set_walls.
+        `stats` is an optional SearchStats hook that records the cost
+        of the search.
+        """
+        self.solution = None
+        if stats is None:
+            return self.search(algorithm, heuristic, None)
+
+        stats.begin(algorithm=algorithm, start=self.start, goal=self.goal)
+        try:
+            self.search(algorithm, heuristic, stats)
+        finally:
+            stats.end(length=(None if self.solution is None
+                              else len(self.solution[0])))
+
+    def search(self, algorithm, heuristic, stats):
+        """Runs the search algorithm for solve."""
+        goal = self.goal
+        if algorithm == "dfs":
+            return self.uninformed(DequeStackFrontier(), stats)
+        if algorithm == "bfs":
+            return self.uninformed(DequeQueueFrontier(), stats)
+        if algorithm == "greedy":
+            return self.best_first(
+                lambda steps, state: heuristic(state, goal), stats)
+        if algorithm == "dstar":
+            if self.planner is None or self.planner.heuristic is not heuristic:
+                self.planner = DStarLite(self, heuristic)
+            self.planner.repair(stats)
+            self.num_explored = self.planner.num_explored
+            self.explored = self.planner.explored
+            self.solution = self.planner.path()
+            return
+        if algorithm in ("astar", "jps"):
+
+            # Among equal estimates, prefer the cell closer to the goal
+            def priority(steps, state):
+                estimate = heuristic(state, goal)
+                return (steps + estimate, estimate)
+
+            if algorithm == "jps":
+                return self.jump_points(priority, stats)
+            return self.best_first(priority, stats)
+        raise ValueError(f"unknown algorithm {algorithm!r}")
+
+    def uninformed(self, frontier, stats):
+        """Searches the maze in the order `frontier` removes nodes."""
 
         # Keep track of number of states explored
         self.num_explored = 0
 
         # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        walls = self.walls
+        goal = walls.index(*self.goal)
+        start = Node(state=walls.index(*self.start), parent=None, action=None)
         frontier.add(start)
 
         # Initialize an empty explored set
-        self.explored = set()
+        explored = self.explored = set()
 
         # Keep looping until solution found
         while True:
@@ -140,28 +619,205 @@ class Maze():
             # Choose a node from the frontier
             node = frontier.remove()
             self.num_explored += 1
+            if stats is not None:
+                stats.expanded()
 
             # If node is the goal, then we have a solution
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+            if node.state == goal:
+                self.solution = self.trace(node)
                 return
 
             # Mark node as explored
-            self.explored.add(node.state)
+            explored.add(node.state)
 
             # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
+            for action, state in walls.moves(node.state):
+                if not frontier.contains_state(state) and state not in explored:
                     child = Node(state=state, parent=node, action=action)
                     frontier.add(child)
+                elif stats is not None:
+                    stats.duplicate()
+            if stats is not None:
+                stats.frontier(len(frontier.frontier))
+
+    def best_first(self, priority, stats):
+        """
+        Searches the maze expanding the queued cell with the lowest
+        priority(steps, state) first, where steps is the length of the
+        best path found to state so far.
+        """
+        self.num_explored = 0
+        explored = self.explored = set()
+
+        walls = self.walls
+        goal = walls.index(*self.goal)
+        start = Node(state=walls.index(*self.start), parent=None, action=None)
+        steps_to = {start.state: 0}
+        frontier = PriorityFrontier()
+        frontier.add(start, priority(0, self.start))
+
+        while True:
+            if frontier.empty():
+                raise Exception("no solution")
+
+            node = frontier.remove()
+            self.num_explored += 1
+            if stats is not None:
+                stats.expanded()
+
+            if node.state == goal:
+                self.solution = self.trace(node)
+                return
+            explored.add(node.state)
+
+            # Queue neighbors unless they are already queued at least
+            # as favourably
+            steps = steps_to[node.state] + 1
+            for action, state in walls.moves(node.state):
+                if state not in explored:
+                    rank = priority(steps, walls.cell(state))
+                    queued = frontier.priority(state)
+                    if queued is None or rank < queued:
+                        steps_to[state] = steps
+                        frontier.add(Node(state=state, parent=node,
+                                          action=action), rank)
+                        continue
+                if stats is not None:
+                    stats.duplicate()
+            if stats is not None:
+                stats.frontier(len(frontier.priorities))
+
+    def jump_points(self, priority, stats):
+        """
+        Searches the maze with jump point search for 4-connected grids:
+        A* over only the cells where some shortest path has to turn,
+        jumping over the straight runs in between.
+
+        Shortest paths are taken in a canonical form that turns from a
+        vertical run into a horizontal one anywhere, but from a
+        horizontal run into a vertical one only just past the end of a
+        wall. So a vertical jump stops at any cell with a jump point
+        along its row, and a horizontal jump only where a wall beside
+        the run ends. Finds paths as short as A*'s.
+        """
+        self.num_explored = 0
+        explored = self.explored = set()
+
+        walls = self.walls
+        goal = walls.index(*self.goal)
+        steps = dict(walls.steps)
+        start = Node(state=walls.index(*self.start), parent=None, action=None)
+        steps_to = {start.state: 0}
+        frontier = PriorityFrontier()
+        frontier.add(start, priority(0, self.start))
+
+        while True:
+            if frontier.empty():
+                raise Exception("no solution")
+
+            node = frontier.remove()
+            self.num_explored += 1
+            if stats is not None:
+                stats.expanded()
+
+            if node.state == goal:
+                self.solution = self.trace(node)
+                return
+            explored.add(node.state)
+
+            for action in self.jump_directions(node):
+                step = steps[action]
+                if action in ("up", "down"):
+                    state = self.jump_vertical(node.state, step, goal)
+                else:
+                    state = self.jump_horizontal(node.state, step, goal)
+                if state is None:
+                    continue
+                if state not in explored:
+                    cost = steps_to[node.state] + (state - node.state) // step
+                    rank = priority(cost, walls.cell(state))
+                    queued = frontier.priority(state)
+                    if queued is None or rank < queued:
+                        steps_to[state] = cost
+                        frontier.add(Node(state=state, parent=node,
+                                          action=action), rank)
+                        continue
+                if stats is not None:
+                    stats.duplicate()
+            if stats is not None:
+                stats.frontier(len(frontier.priorities))
+
+    def jump_directions(self, node):
+        """Returns the directions jump point search jumps in from node."""
+        if node.parent is None:
+            return ["up", "down", "left", "right"]
+        if node.action in ("up", "down"):
+            return [node.action, "left", "right"]
+
+        # Turn up or down only around the end of a wall beside the run
+        walls = self.walls
+        back = node.state + (1 if node.action == "left" else -1)
+        directions = [node.action]
+        for action, step in walls.steps[:2]:
+            if walls.is_wall(back + step) and not walls.is_wall(node.state + step):
+                directions.append(action)
+        return directions
+
+    def jump_horizontal(self, index, step, goal):
+        """
+        Runs along a row from index by `step` (1 or -1). Returns the first
+        cell that is the goal or has a wall end beside it, or None if the
+        run hits a wall first.
+        """
+        bits = self.walls.bits
+        stride = self.walls.stride
+        while True:
+            index += step
+            if bits[index >> 3] >> (index & 7) & 1:
+                return None
+            if index == goal:
+                return index
+            for side in (index - stride, index + stride):
+                behind = side - step
+                if (bits[behind >> 3] >> (behind & 7) & 1
+                        and not bits[side >> 3] >> (side & 7) & 1):
+                    return index
+
+    def jump_vertical(self, index, step, goal):
+        """
+        Runs along a column from index by `step` (one row up or down).
+        Returns the first cell that is the goal or from which a
+        horizontal jump finds a jump point, or None if the run hits a
+        wall first.
+        """
+        bits = self.walls.bits
+        while True:
+            index += step
+            if bits[index >> 3] >> (index & 7) & 1:
+                return None
+            if (index == goal
+                    or self.jump_horizontal(index, 1, goal) is not None
+                    or self.jump_horizontal(index, -1, goal) is not None):
+                return index
+
+    def trace(self, node):
+        """
+        Returns the (actions, cells) of the path that led to node,
+        filling in the cells between jump points.
+        """
+        steps = dict(self.walls.steps)
+        actions = []
+        cells = []
+        while node.parent is not None:
+            state = node.state
+            while state != node.parent.state:
+                actions.append(node.action)
+                cells.append(self.walls.cell(state))
+                state -= steps[node.action]
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
 
 
     def output_image(self, filename, show_solution=True, show_explored=False):
@@ -177,8 +833,8 @@ class Maze():
         )
         draw = ImageDraw.Draw(img)
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
+        solution = set(self.solution[1]) if self.solution is not None else None
+        for i, row in enumerate(self.walls.rows()):
             for j, col in enumerate(row):
 
                 # Walls
@@ -198,7 +854,7 @@ class Maze():
                     fill = (220, 235, 113)
 
                 # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
+                elif solution is not None and show_explored and self.walls.index(i, j) in self.explored:
                     fill = (212, 97, 85)
 
                 # Empty cell
@@ -215,15 +871,39 @@ class Maze():
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+def main():
+    parser = argparse.ArgumentParser(description="Solve a maze.")
+    parser.add_argument("maze", help="maze text file")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="dfs",
+                        help="search algorithm used to solve the maze")
+    parser.add_argument("--heuristic", choices=HEURISTICS,
+                        default="manhattan",
+                        help="estimate of the moves left used by greedy "
+                             "and astar")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="append the search statistics to FILE "
+                             "as a JSON line")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="include the memory high-water mark in "
+                             "--stats (slower)")
+    args = parser.parse_args()
+
+    m = Maze(args.maze)
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    stats = SearchStats(args.trace_memory) if args.stats else None
+    try:
+        m.solve(args.algorithm, HEURISTICS[args.heuristic], stats)
+    finally:
+        if stats is not None:
+            with open(args.stats, "a") as f:
+                f.write(stats.to_json() + "\n")
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
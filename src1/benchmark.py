@@ -0,0 +1,104 @@
+import random
+import sys
+import time
+
+from logic import *
+
+USAGE = "Usage: python benchmark.py [largest size] [seed]"
+
+# Largest number of symbols the enumerating model_check is timed on
+ENUMERATE_LIMIT = 12
+
+
+def puzzle(size, seed):
+    """
+    Returns (knowledge, symbols) of a mastermind-style puzzle: `size`
+    colors each go in a different one of `size` positions, and a few
+    clues about a hidden arrangement pin some of them down.
+    """
+    rng = random.Random(seed)
+    colors = [f"color{c}" for c in range(size)]
+    symbols = [Symbol(f"{color}{i}") for color in colors for i in range(size)]
+
+    knowledge = And()
+    for color in colors:
+        knowledge.add(Or(*[Symbol(f"{color}{i}") for i in range(size)]))
+        for i in range(size):
+            for j in range(size):
+                if i != j:
+                    knowledge.add(Implication(
+                        Symbol(f"{color}{i}"), Not(Symbol(f"{color}{j}"))
+                    ))
+    for i in range(size):
+        for c1 in colors:
+            for c2 in colors:
+                if c1 != c2:
+                    knowledge.add(Implication(
+                        Symbol(f"{c1}{i}"), Not(Symbol(f"{c2}{i}"))
+                    ))
+
+    # Reveal where half the colors are not, and one that is in place
+    hidden = colors[:]
+    rng.shuffle(hidden)
+    for i, color in enumerate(hidden[:size // 2]):
+        wrong = rng.choice([j for j in range(size) if j != i])
+        knowledge.add(Not(Symbol(f"{color}{wrong}")))
+    knowledge.add(Symbol(f"{hidden[0]}0"))
+    return knowledge, symbols
+
+
+def per_symbol(check, knowledge, symbols):
+    """Classifies symbols with two model_check calls each, as clue.py did."""
+    answers = {}
+    for symbol in symbols:
+        if check(knowledge, symbol):
+            answers[symbol] = True
+        elif check(knowledge, Not(symbol)):
+            answers[symbol] = False
+        else:
+            answers[symbol] = None
+    return answers
+
+
+def session(knowledge, symbols):
+    """Classifies symbols in one EntailmentSession."""
+    return EntailmentSession(knowledge).classify(symbols)
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit(USAGE)
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    methods = [
+        ("enumerate", lambda k, s: per_symbol(model_check_enumerate, k, s)),
+        ("per symbol", lambda k, s: per_symbol(model_check, k, s)),
+        ("session", session),
+    ]
+    print(f"{'size':>5}{'symbols':>9}  {'method':<12}{'ms':>10}"
+          f"{'entailed':>10}{'refuted':>9}{'unknown':>9}")
+    for size in range(3, largest + 1):
+        knowledge, symbols = puzzle(size, seed)
+        expected = None
+        for method, classify in methods:
+            if method == "enumerate" and len(symbols) > ENUMERATE_LIMIT:
+                continue
+            start = time.perf_counter()
+            answers = classify(knowledge, symbols)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            # Every method must classify every symbol the same way
+            if expected is None:
+                expected = answers
+            elif answers != expected:
+                sys.exit(f"{method} disagrees on size {size}.")
+
+            counts = [list(answers.values()).count(answer)
+                      for answer in (True, False, None)]
+            print(f"{size:>5}{len(symbols):>9}  {method:<12}{elapsed:>10.2f}"
+                  f"{counts[0]:>10}{counts[1]:>9}{counts[2]:>9}")
+
+
+if __name__ == "__main__":
+    main()